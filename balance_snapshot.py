@@ -0,0 +1,143 @@
+"""
+Balance Snapshot - Admin wallet balances from a single Multicall3 eth_call
+
+Every token balance and the native BNB balance are read together through the
+canonical Multicall3 contract (aggregate3 + getEthBalance) and cached, so
+/balance and payout pre-flight checks work from local state. The snapshot is
+invalidated when the monitor sees a deposit or the handler sends a payout,
+and expires after BALANCE_SNAPSHOT_TTL as a safety net for transfers made
+outside the bot.
+
+Payouts that were admitted but are not mined yet are held as reservations,
+so concurrent payouts can't both spend the same balance.
+"""
+import asyncio
+import logging
+import time
+from collections import namedtuple
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+from config import MULTICALL3_ADDRESS, BALANCE_SNAPSHOT_TTL
+from rpc_client import make_web3
+from token_registry import ERC20_ABI, TokenRegistry, encode_address
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")        # aggregate3((address,bool,bytes)[])
+GET_ETH_BALANCE_SELECTOR = bytes.fromhex("4d2301cc")   # getEthBalance(address)
+
+# tokens: symbol -> raw balance (None if that call failed), native: wei
+Balances = namedtuple("Balances", ["tokens", "native", "fetched_at"])
+
+
+class BalanceSnapshot:
+    def __init__(self, w3=None, tokens=None, ttl=BALANCE_SNAPSHOT_TTL):
+        self.w3 = w3 or make_web3()
+        self.tokens = tokens or TokenRegistry(self.w3, ERC20_ABI)
+        self.ttl = ttl
+        self.multicall_address = Web3.to_checksum_address(MULTICALL3_ADDRESS)
+
+        self._balances = None
+        # Bumped on every invalidate, so a fetch that overlapped one isn't cached
+        self._generation = 0
+        self._inflight = None
+        self._inflight_generation = None
+        # symbol (None for BNB) -> raw amount promised to unmined payouts
+        self._reserved = {}
+
+    def invalidate(self):
+        """Drop the cached snapshot; the next read goes to the chain"""
+        self._balances = None
+        self._generation += 1
+
+    async def get(self):
+        """
+        Current admin balances
+
+        Returns:
+            Balances: Cached if still fresh, otherwise re-read in one eth_call
+            (concurrent callers share the same request)
+        """
+        balances = self._balances
+        if balances is not None and time.monotonic() - balances.fetched_at < self.ttl:
+            return balances
+
+        # A fetch that started before the last invalidate may predate the change
+        if (self._inflight is None or self._inflight.done()
+                or self._inflight_generation != self._generation):
+            self._inflight_generation = self._generation
+            self._inflight = asyncio.ensure_future(self._fetch(self._generation))
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self, generation):
+        await self.tokens.load()
+        tokens = list(self.tokens.tokens.values())
+        admin = self.tokens.admin_address
+
+        calls = [
+            (token.address, True, bytes.fromhex(token.balance_of_data[2:])) for token in tokens
+        ]
+        calls.append((self.multicall_address, True, GET_ETH_BALANCE_SELECTOR + encode_address(admin)))
+
+        data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [calls])
+        raw = await self.w3.eth.call({'to': self.multicall_address, 'data': "0x" + data.hex()})
+        (results,) = decode(["(bool,bytes)[]"], bytes(raw))
+
+        values = [
+            int.from_bytes(return_data, 'big') if success and len(return_data) >= 32 else None
+            for success, return_data in results
+        ]
+        if values[-1] is None:
+            raise ValueError("Multicall3 getEthBalance failed")
+
+        balances = Balances(
+            {token.symbol: value for token, value in zip(tokens, values)}, values[-1], time.monotonic()
+        )
+        if generation == self._generation:
+            self._balances = balances
+        return balances
+
+    # ---- reservations ----
+
+    def spendable(self, balances, token_symbol=None):
+        """
+        Raw balance left after reservations
+
+        Args:
+            balances: Balances from get()
+            token_symbol: Token symbol, or None for BNB in wei
+
+        Returns:
+            int: Unreserved amount, or None if the balance is unavailable
+        """
+        raw = balances.native if token_symbol is None else balances.tokens.get(token_symbol)
+        return None if raw is None else raw - self._reserved.get(token_symbol, 0)
+
+    def reserve(self, token_symbol, amount):
+        """Hold a raw amount (token_symbol None for BNB) until release()"""
+        self._reserved[token_symbol] = self._reserved.get(token_symbol, 0) + amount
+
+    def release(self, token_symbol, amount):
+        remaining = self._reserved.get(token_symbol, 0) - amount
+        if remaining > 0:
+            self._reserved[token_symbol] = remaining
+        else:
+            self._reserved.pop(token_symbol, None)
+
+    async def token_balance(self, token_symbol):
+        """Admin balance of a token in token units, or None if unavailable"""
+        token = await self.tokens.get(token_symbol)
+        if token is None:
+            return None
+        raw = (await self.get()).tokens.get(token_symbol)
+        return None if raw is None else token.from_units(raw)
+
+    async def native_balance(self):
+        """Admin BNB balance in ether"""
+        return self.w3.from_wei((await self.get()).native, 'ether')
+
+
+# Global balance snapshot instance
+balance_snapshot = BalanceSnapshot()
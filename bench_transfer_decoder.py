@@ -0,0 +1,105 @@
+"""
+Benchmark: Transfer log decoding, web3 event ABI path vs the raw fast path
+
+Builds synthetic raw eth_getLogs results and decodes them both ways:
+
+- web3: format the raw log the way get_logs returns it (HexBytes fields,
+  checksummed address) and run contract.events.Transfer().process_log
+- fast: transfer_log.decode_transfer_log straight from the JSON strings
+
+Usage: python bench_transfer_decoder.py [log_count]
+"""
+import os
+import random
+import sys
+import time
+
+# Throwaway wallet so the modules import without a .env
+os.environ.setdefault("ADMIN_WALLET_ADDRESS", "0x1B87349DD046F7A6c9c63FBbA58108943a942092")
+
+from hexbytes import HexBytes  # noqa: E402
+from web3 import Web3  # noqa: E402
+
+from config import ADMIN_WALLET_ADDRESS, TOKEN_CONTRACTS  # noqa: E402
+from transfer_log import TRANSFER_TOPIC, decode_transfer_log  # noqa: E402
+
+TRANSFER_EVENT_ABI = [{
+    "anonymous": False,
+    "inputs": [
+        {"indexed": True, "name": "from", "type": "address"},
+        {"indexed": True, "name": "to", "type": "address"},
+        {"indexed": False, "name": "value", "type": "uint256"}
+    ],
+    "name": "Transfer",
+    "type": "event"
+}]
+
+
+def synthetic_logs(count, seed=1):
+    rng = random.Random(seed)
+    token = TOKEN_CONTRACTS["USDT"]
+    admin_topic = "0x" + "0" * 24 + ADMIN_WALLET_ADDRESS.lower()[2:]
+    logs = []
+    for i in range(count):
+        sender = "%040x" % rng.getrandbits(160)
+        logs.append({
+            'address': token.lower(),
+            'topics': [TRANSFER_TOPIC, "0x" + "0" * 24 + sender, admin_topic],
+            'data': "0x%064x" % rng.getrandbits(80),
+            'blockNumber': hex(30_000_000 + i // 50),
+            'blockHash': "0x%064x" % rng.getrandbits(256),
+            'transactionHash': "0x%064x" % rng.getrandbits(256),
+            'transactionIndex': hex(i % 50),
+            'logIndex': hex(i % 200),
+            'removed': False
+        })
+    return logs
+
+
+def web3_path(contract, raw_logs):
+    event = contract.events.Transfer()
+    decoded = []
+    for log in raw_logs:
+        formatted = {
+            'address': Web3.to_checksum_address(log['address']),
+            'topics': [HexBytes(topic) for topic in log['topics']],
+            'data': HexBytes(log['data']),
+            'blockNumber': int(log['blockNumber'], 16),
+            'blockHash': HexBytes(log['blockHash']),
+            'transactionHash': HexBytes(log['transactionHash']),
+            'transactionIndex': int(log['transactionIndex'], 16),
+            'logIndex': int(log['logIndex'], 16),
+            'removed': log['removed']
+        }
+        decoded.append(event.process_log(formatted))
+    return decoded
+
+
+def fast_path(raw_logs):
+    return [decode_transfer_log(log) for log in raw_logs]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    raw_logs = synthetic_logs(count)
+    contract = Web3().eth.contract(
+        address=Web3.to_checksum_address(TOKEN_CONTRACTS["USDT"]), abi=TRANSFER_EVENT_ABI
+    )
+
+    # Both paths must agree before timing means anything
+    for slow, fast in zip(web3_path(contract, raw_logs[:100]), fast_path(raw_logs[:100])):
+        assert slow['args']['from'].lower() == fast.from_address
+        assert slow['args']['value'] == fast.value
+
+    timings = {}
+    for name, run in (("web3", lambda: web3_path(contract, raw_logs)), ("fast", lambda: fast_path(raw_logs))):
+        started = time.perf_counter()
+        run()
+        timings[name] = time.perf_counter() - started
+        print(f"{name:>5}: {timings[name]:7.3f} s total, {timings[name] / count * 1e6:7.2f} us/log")
+
+    print(f"speedup: {timings['web3'] / timings['fast']:.1f}x on {count} logs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,52 @@
 """
 Blockchain Monitor - Direct Web3 Reading (NO API NEEDED)
 Reads directly from BSC blockchain for instant, unlimited transaction detection
+
+All RPC calls go through AsyncWeb3 on the shared RPC client, so a scan never
+blocks the bot's event loop.
 """
 
 import asyncio
 import logging
+from collections import namedtuple
 from datetime import datetime
 from web3 import Web3
-from web3.exceptions import BlockNotFound
-from telegram import Bot
+
+from balance_snapshot import balance_snapshot
+from chain_cache import ChainMetadataCache
+from deal_index import DealIndex, to_base_units, from_base_units
+from head_tracker import HeadTracker
+from log_subscriber import LogSubscriber
+from monitor_store import MonitorStore
+from notification_outbox import outbox
+from pending_deposits import PendingDeposits
+from range_scanner import AdaptiveRangeScanner
+from rpc_batch import RpcBatchError
+from rpc_client import make_web3, rpc_client
+from transfer_log import TRANSFER_TOPIC, decode_transfer_log
+from tx_dedup import ProcessedTxSet, tx_hash_key
 
 from config import (
     ADMIN_WALLET_ADDRESS,
-    BSC_RPC_URL,
+    BSC_WS_URL,
+    DEPOSIT_RECEIPT_RETRIES,
     TOKEN_CONTRACTS,
-    CONFIRMATION_BLOCKS,
     POLLING_INTERVAL,
-    TELEGRAM_BOT_TOKEN,
+    RPC_MAX_CONCURRENCY,
+    SCAN_START_LOOKBACK,
     GROUP_CHAT_ID
 )
 
 logger = logging.getLogger(__name__)
 
 # =========================
-# Telegram Bot
+# Telegram Notifications
 # =========================
-telegram_bot = Bot(token=TELEGRAM_BOT_TOKEN)
-
-async def send_group_notification(message: str):
-    await telegram_bot.send_message(
-        chat_id=GROUP_CHAT_ID,
-        text=message,
+def send_group_notification(message: str):
+    """Queue a group message on the outbox; scans never wait on Telegram"""
+    return outbox.post(
+        GROUP_CHAT_ID,
+        message,
         parse_mode="HTML",
         disable_web_page_preview=True
     )
@@ -65,6 +81,18 @@ TOKEN_ABI = [
     }
 ]
 
+def address_to_topic(address):
+    """Left-pad a 20-byte address to a 32-byte indexed topic"""
+    return "0x" + "0" * 24 + address.lower()[2:]
+
+
+# A decoded Transfer log paired with the deal it pays for
+DepositMatch = namedtuple(
+    "DepositMatch",
+    ["deal_id", "token", "tx_hash", "from_address", "value", "block_number"]
+)
+
+
 class BlockchainMonitorWeb3:
     """
     Direct blockchain reading - NO API needed!
@@ -72,109 +100,501 @@ class BlockchainMonitorWeb3:
     """
 
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(BSC_RPC_URL))
-        self.monitored_deals = {}
-        self.processed_txs = set()
-        self.last_checked_block = None
-
-        if not self.w3.is_connected():
+        self.w3 = make_web3()
+
+        # Resume exactly where the previous process stopped
+        self.store = MonitorStore()
+        self.monitored_deals = self.store.load_deals()
+        self.processed_txs = ProcessedTxSet()
+        for tx_hash, block_number in self.store.load_processed_txs():
+            self.processed_txs.add(tx_hash, block_number)
+        self.last_checked_block = self.store.get_checkpoint()
+        self.pending = PendingDeposits()
+        for row in self.store.load_pending():
+            self.pending.add(DepositMatch(**row))
+        # tx_hash -> scans a ready deposit went without a receipt
+        self._receipt_misses = {}
+
+        # Recent block hashes, used to detect reorgs before trusting a range
+        self.head_tracker = HeadTracker()
+        self._reorg_suspect = None
+
+        # Bounds the number of RPC calls a scan keeps in flight at once
+        self.rpc_semaphore = asyncio.Semaphore(RPC_MAX_CONCURRENCY)
+
+        # Contract handles are built once and shared by every scan
+        self.admin_address = Web3.to_checksum_address(ADMIN_WALLET_ADDRESS)
+        self.admin_topic = address_to_topic(self.admin_address)
+        self.token_contracts = {
+            symbol: self.w3.eth.contract(
+                address=Web3.to_checksum_address(address),
+                abi=TOKEN_ABI
+            )
+            for symbol, address in TOKEN_CONTRACTS.items()
+        }
+        self.token_by_address = {
+            contract.address.lower(): symbol
+            for symbol, contract in self.token_contracts.items()
+        }
+        self.metadata = ChainMetadataCache()
+        self.batcher = rpc_client
+        self.scanner = AdaptiveRangeScanner(self._fetch_transfer_logs)
+        self.deal_index = DealIndex()
+        self._connected = False
+
+        # Scans can be started by the poll job and by new pushed heads
+        self._scan_lock = asyncio.Lock()
+        self._pushed_payments = []
+
+        # Optional push mode; polling stays the fallback whenever it is down
+        self.subscriber = None
+        self._stream_logs = []
+        self._stream_head = None
+        self._stream_task = None
+        # After a reorg, ranges up to this block are re-read with eth_getLogs
+        self._stream_trusted_from = 0
+        if BSC_WS_URL:
+            self.subscriber = LogSubscriber(
+                BSC_WS_URL,
+                self._log_filter(),
+                self._on_stream_head,
+                self._on_stream_log
+            )
+
+    async def connect(self):
+        """Verify the RPC connection and load token metadata"""
+        if not await self.w3.is_connected():
             raise Exception("Cannot connect to BSC network")
 
-        logger.info(f"Connected to BSC - Block: {self.w3.eth.block_number}")
+        await self.metadata.load_tokens(self.token_contracts.values(), self._rpc)
+        self._connected = True
+
+        # Deals added before connecting could not be converted to base units yet
+        for deal_id, deal_info in list(self.monitored_deals.items()):
+            self._index_deal(deal_id, deal_info)
+
+        logger.info(f"Connected to BSC - Block: {await self.w3.eth.block_number}")
+
+    @property
+    def connected(self):
+        return self._connected
 
     def start_monitoring(self, deal_id, deal_info):
         self.monitored_deals[deal_id] = deal_info
+        self.store.save_deal(deal_id, deal_info)
 
-        if self.last_checked_block is None:
-            self.last_checked_block = self.w3.eth.block_number - 100
+        if self.connected:
+            self._index_deal(deal_id, deal_info)
 
         logger.info(f"Started monitoring for deal {deal_id}")
 
     def stop_monitoring(self, deal_id):
         if deal_id in self.monitored_deals:
             del self.monitored_deals[deal_id]
+            self.deal_index.remove(deal_id)
+            self.store.delete_deal(deal_id)
+            dropped = self.pending.discard_deal(deal_id)
+            if dropped:
+                self.store.commit_scan(None, pending_removed=[d.tx_hash for d in dropped])
             logger.info(f"Stopped monitoring for deal {deal_id}")
 
-    async def check_transactions(self):
-        if not self.monitored_deals:
-            return []
+    async def _rpc(self, awaitable):
+        async with self.rpc_semaphore:
+            return await awaitable
+
+    def _log_filter(self):
+        """Transfer logs to the admin wallet across all supported tokens"""
+        return {
+            'address': [contract.address for contract in self.token_contracts.values()],
+            'topics': [TRANSFER_TOPIC, None, self.admin_topic]
+        }
+
+    async def _endpoint_head(self):
+        """Latest block number of the endpoint answering this scan"""
+        response = await self._rpc(self.batcher.request('eth_blockNumber'))
+        if 'error' in response:
+            raise RpcBatchError('eth_blockNumber', [], response['error'])
+        return int(response['result'], 16)
+
+    async def _fetch_transfer_logs(self, from_block, to_block):
+        """
+        Fetch the Transfer logs for a block range with a single eth_getLogs call
+
+        The raw JSON is decoded by the Transfer fast path rather than web3's
+        result formatters.
+        """
+        params = [{'fromBlock': hex(from_block), 'toBlock': hex(to_block), **self._log_filter()}]
+        response = await self._rpc(self.batcher.request('eth_getLogs', params))
+        if 'error' in response:
+            raise RpcBatchError('eth_getLogs', params, response['error'])
+
+        logs = []
+        for raw_log in response['result']:
+            log = decode_transfer_log(raw_log)
+            if log is not None:
+                logs.append(log)
+        return logs
+
+    # ---- push mode ----
+
+    async def run_stream(self):
+        """Run the WebSocket subscription until cancelled (no-op without BSC_WS_URL)"""
+        if self.subscriber is None:
+            return
+        await self.subscriber.run()
+
+    @property
+    def stream_live(self):
+        return (
+            self.subscriber is not None
+            and self.subscriber.live
+            and self._stream_head is not None
+        )
+
+    def _stream_covers(self, from_block):
+        return from_block >= max(self.subscriber.covered_from, self._stream_trusted_from)
+
+    def _on_stream_log(self, raw_log):
+        log = decode_transfer_log(raw_log)
+        if log is None:
+            return
+        if log.removed:
+            key = (log.tx_hash, log.log_index)
+            self._stream_logs = [
+                l for l in self._stream_logs
+                if (l.tx_hash, l.log_index) != key
+            ]
+            return
+        self._stream_logs.append(log)
+
+    async def _on_stream_head(self, header):
+        self._note_header(header)
+        self._stream_head = int(header['number'], 16)
+
+        # Don't stall the socket reader; a running scan will pick up the new head next time
+        if self._scan_lock.locked() or (self._stream_task and not self._stream_task.done()):
+            return
+        self._stream_task = asyncio.create_task(self._scan_from_stream())
+
+    async def _scan_from_stream(self):
+        try:
+            self._pushed_payments.extend(await self._scan())
+        except Exception as e:
+            logger.error(f"Push-triggered scan failed: {e}")
+
+    def _take_stream_logs(self, from_block, to_block):
+        """Pop buffered pushed logs up to to_block, returning those in range"""
+        logs = [l for l in self._stream_logs if from_block <= l.block_number <= to_block]
+        self._stream_logs = [l for l in self._stream_logs if l.block_number > to_block]
+        return logs
+
+    def _drop_stream_logs(self):
+        """Discard pushed logs nobody will read; those blocks are re-read with eth_getLogs"""
+        if self._stream_logs and self._stream_head is not None:
+            self._stream_logs = [l for l in self._stream_logs if l.block_number > self._stream_head]
+            self._stream_trusted_from = max(self._stream_trusted_from, self._stream_head + 1)
+
+    def _index_deal(self, deal_id, deal_info):
+        crypto = deal_info.get('crypto', '').upper()
+        contract = self.token_contracts.get(crypto)
+        if contract is None:
+            logger.warning(f"Deal {deal_id} uses unsupported token {crypto}")
+            self.deal_index.remove(deal_id)
+            return
+
+        self.deal_index.add(
+            deal_id,
+            contract.address,
+            deal_info['seller_address'],
+            to_base_units(deal_info['amount'], self.metadata.decimals(contract.address))
+        )
+
+    def _match_logs(self, logs):
+        """Pair decoded Transfer logs with the deals they pay for"""
+        matches = []
+        for log in logs:
+            try:
+                token = self.token_by_address.get(log.token_address)
+                if token is None:
+                    continue
 
-        detected_payments = []
-        current_block = self.w3.eth.block_number
+                tx_hash = log.tx_hash
+                if tx_hash in self.processed_txs or tx_hash in self.pending:
+                    continue
 
-        if self.last_checked_block is None:
-            self.last_checked_block = current_block - 100
+                # A log from a block we know was replaced is stale
+                recorded_hash = self.head_tracker.get(log.block_number)
+                if recorded_hash is not None and recorded_hash != log.block_hash:
+                    continue
 
-        from_block = self.last_checked_block + 1
-        to_block = current_block
+                deal_id = self.deal_index.match(log.token_address, log.from_address, log.value)
+                if deal_id is None:
+                    continue
 
-        if from_block > to_block:
-            return []
+                matches.append(DepositMatch(
+                    deal_id, token, tx_hash, Web3.to_checksum_address(log.from_address),
+                    log.value, log.block_number
+                ))
 
-        for deal_id, deal_info in list(self.monitored_deals.items()):
-            try:
-                token_address = TOKEN_CONTRACTS.get(deal_info['crypto'])
-                if not token_address:
-                    continue
+            except Exception as e:
+                logger.error(f"Error processing log {log.tx_hash}: {e}")
 
-                contract = self.w3.eth.contract(
-                    address=Web3.to_checksum_address(token_address),
-                    abi=TOKEN_ABI
-                )
+        return matches
 
-                transfer_filter = contract.events.Transfer.create_filter(
-                    fromBlock=from_block,
-                    toBlock=to_block,
-                    argument_filters={
-                        'to': Web3.to_checksum_address(ADMIN_WALLET_ADDRESS)
-                    }
-                )
+    async def check_transactions(self):
+        """Scan for new deposits; also returns any found by push-triggered scans"""
+        detected_payments = await self._scan()
+        if self._pushed_payments:
+            detected_payments = self._pushed_payments + detected_payments
+            self._pushed_payments = []
+        return detected_payments
 
-                events = transfer_filter.get_all_entries()
+    async def _scan(self):
+        # Head, headers, logs and receipts of one scan all come from one endpoint
+        async with self._scan_lock:
+            with self.batcher.pool.scan():
+                return await self._scan_locked()
 
-                for event in events:
-                    tx_hash = event['transactionHash'].hex()
+    async def _scan_locked(self):
+        if not self.monitored_deals:
+            self._drop_stream_logs()
+            return []
 
-                    if tx_hash in self.processed_txs:
-                        continue
+        if not self.connected:
+            await self.connect()
 
-                    tx_receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        stream_live = self.stream_live
+        current_block = await self._sync_head(stream_live)
 
-                    from_address = event['args']['from']
-                    to_address = event['args']['to']
-                    value = event['args']['value']
+        if self._reorg_suspect is not None:
+            suspect = self._reorg_suspect
+            fork_block = await self.head_tracker.find_fork(suspect, self._fetch_block_hash)
+            self._reorg_suspect = None
+            await self._handle_reorg(fork_block, current_block)
 
-                    decimals = contract.functions.decimals().call()
-                    amount = value / (10 ** decimals)
-                    symbol = contract.functions.symbol().call()
+        if self.last_checked_block is None:
+            self.last_checked_block = current_block - SCAN_START_LOOKBACK
+
+        # Every match is queued; the checkpoint can then always move past it
+        checkpoint = None
+        newly_pending = []
+        scanned = await self._scan_new_logs(current_block, stream_live)
+        if scanned is not None:
+            logs, checkpoint = scanned
+            for match in self._match_logs(logs):
+                if self.pending.add(match):
+                    newly_pending.append(match)
+        if newly_pending:
+            # Incoming funds changed the admin balances
+            balance_snapshot.invalidate()
+
+        # Promote only the deposits whose confirmation depth was just reached
+        ready = self.pending.pop_ready(current_block)
+        detected_payments, processed, settled, rehomed = await self._confirm_deposits(ready, current_block)
+
+        self._advance_checkpoint(checkpoint, processed, newly_pending + rehomed, settled)
+        return detected_payments
 
-                    if not self._verify_transaction_web3(
-                        from_address, to_address, amount, symbol, deal_info, tx_receipt
-                    ):
-                        continue
+    async def _scan_new_logs(self, current_block, stream_live):
+        """
+        Collect Transfer logs past the checkpoint
 
-                    confirmations = current_block - tx_receipt['blockNumber']
+        Returns:
+            tuple: (logs, last block covered), or None if there is nothing new
+        """
+        from_block = self.last_checked_block + 1
+        to_block = current_block
 
-                    if confirmations >= CONFIRMATION_BLOCKS:
-                        self.processed_txs.add(tx_hash)
+        stream_covers = stream_live and self._stream_covers(from_block)
 
-                        payment_data = {
-                            'deal_id': deal_id,
-                            'tx_hash': tx_hash,
-                            'from_address': from_address,
-                            'amount': amount,
-                            'token': symbol,
-                            'confirmations': confirmations,
-                            'timestamp': datetime.fromtimestamp(
-                                self.w3.eth.get_block(tx_receipt['blockNumber'])['timestamp']
-                            )
-                        }
+        if stream_covers:
+            # Logs of the newest head may still be in flight on the socket
+            to_block = current_block - 1
 
-                        detected_payments.append(payment_data)
+        if from_block > to_block:
+            return None
+
+        if not len(self.deal_index):
+            self._take_stream_logs(from_block, to_block)
+            return [], to_block
+
+        if stream_covers:
+            # Every log in the range was already pushed; no eth_getLogs needed
+            return self._take_stream_logs(from_block, to_block), to_block
+
+        if stream_live:
+            # The head came from the socket; the HTTP endpoint may not have it yet
+            to_block = min(to_block, await self._endpoint_head())
+            if from_block > to_block:
+                return None
+
+        # Only the contiguous scanned prefix is processed; anything past a
+        # failed chunk is retried next poll from the checkpoint
+        logs, to_block = await self.scanner.scan(from_block, to_block)
+        if to_block < from_block:
+            return None
+        self._take_stream_logs(from_block, to_block)
+        return logs, to_block
+
+    # ---- head tracking / reorgs ----
+
+    def _note_header(self, header):
+        """Record a raw block header and flag a reorg if it breaks the chain"""
+        number = int(header['number'], 16)
+        suspect = self.head_tracker.record(number, header['hash'].lower(), header['parentHash'].lower())
+        if suspect is not None:
+            self._reorg_suspect = max(suspect, self._reorg_suspect or suspect)
+        if 'timestamp' in header:
+            self.metadata.put_block_timestamp(number, int(header['timestamp'], 16))
+
+    async def _sync_head(self, stream_live):
+        """
+        Return the current head, recording every header since the last one seen
+
+        In push mode the headers were already recorded as they arrived. When
+        polling, the latest header and any skipped ones are fetched in one batch.
+        """
+        if stream_live:
+            return self._stream_head
+
+        latest = (await self.batcher.call_many([("eth_getBlockByNumber", ["latest", False])]))[0]
+        if isinstance(latest, RpcBatchError) or latest is None:
+            raise Exception(f"Cannot read latest block: {latest}")
+        latest_number = int(latest['number'], 16)
+
+        # On the first poll this backfills the whole ring
+        first = latest_number - self.head_tracker.size + 1
+        if self.head_tracker.head is not None:
+            first = max(self.head_tracker.head + 1, first)
+        headers = await self.batcher.call_many([
+            ("eth_getBlockByNumber", [hex(number), False]) for number in range(first, latest_number)
+        ])
+        for header in headers:
+            if not isinstance(header, RpcBatchError) and header is not None:
+                self._note_header(header)
+
+        self._note_header(latest)
+        return latest_number
+
+    async def _fetch_block_hash(self, number):
+        block = (await self.batcher.call_many([("eth_getBlockByNumber", [hex(number), False])]))[0]
+        if isinstance(block, RpcBatchError) or block is None:
+            raise Exception(f"Cannot read block {number}: {block}")
+        return block['hash'].lower()
+
+    async def _handle_reorg(self, fork_block, current_block):
+        """Rewind everything derived from blocks at or above `fork_block`"""
+        logger.warning(f"Chain reorg detected, blocks from {fork_block} orphaned")
+
+        dropped_pending = self.pending.discard_from_block(fork_block)
+        dropped_confirmed = self.processed_txs.discard_from_block(fork_block)
+        self.metadata.forget_blocks_from(fork_block)
+        balance_snapshot.invalidate()
+
+        if self.last_checked_block is not None and self.last_checked_block >= fork_block:
+            self.last_checked_block = fork_block - 1
+        # Pushed logs up to the current head may belong to either branch
+        self._stream_trusted_from = current_block + 1
+
+        self.store.rewind(fork_block, self.last_checked_block)
+
+        for deposit in dropped_pending:
+            logger.warning(f"Pending deposit {deposit.tx_hash} orphaned by reorg")
+
+        for tx_hash in dropped_confirmed:
+            tx_hash = "0x" + tx_hash.hex()
+            logger.error(f"Confirmed deposit {tx_hash} orphaned by reorg")
+            send_group_notification(
+                f"⚠️ <b>Chain reorg</b>\n\nDeposit <code>{tx_hash}</code> was in an orphaned "
+                f"block and is being re-verified. Hold releases for it."
+            )
+
+    async def _confirm_deposits(self, ready, current_block):
+        """
+        Verify and announce deposits that reached CONFIRMATION_BLOCKS
+
+        Returns:
+            tuple: (payments, processed (tx_hash, block) pairs,
+                    tx hashes that left the pending queue,
+                    deposits re-queued under the block they were mined in)
+        """
+        detected_payments = []
+        processed = []
+        settled = []
+        rehomed = []
+        if not ready:
+            return detected_payments, processed, settled, rehomed
+
+        receipts = await self._fetch_receipts_and_blocks(
+            [deposit.tx_hash for deposit in ready],
+            {deposit.block_number for deposit in ready}
+        )
+
+        for deposit in ready:
+            deal_id, token, tx_hash, from_address, value, block_number = deposit
+            try:
+                timestamp = self.metadata.get_block_timestamp(block_number)
+                if tx_hash not in receipts or timestamp is None:
+                    # Lookup failed; keep it queued and retry on the next head
+                    self.pending.add(deposit)
+                    continue
 
-                        # 🔔 GROUP NOTIFICATION
-                        tx_link = self.get_transaction_link(tx_hash)
-                        message = f"""
+                tx_receipt = receipts[tx_hash]
+                if tx_receipt is None:
+                    # The node doesn't have the tx (e.g. dropped by a reorg);
+                    # it may still be re-mined, but don't wait forever
+                    misses = self._receipt_misses.get(tx_hash, 0) + 1
+                    if misses < DEPOSIT_RECEIPT_RETRIES:
+                        self._receipt_misses[tx_hash] = misses
+                        self.pending.add(deposit)
+                    else:
+                        self._receipt_misses.pop(tx_hash, None)
+                        settled.append(tx_hash)
+                        logger.error(
+                            f"Dropping deposit {tx_hash} for deal {deal_id}: "
+                            f"no receipt after {misses} attempts"
+                        )
+                    continue
+                self._receipt_misses.pop(tx_hash, None)
+
+                mined_in = int(tx_receipt['blockNumber'], 16)
+                if mined_in != block_number:
+                    # Re-mined in another block by a reorg; count confirmations from there
+                    logger.warning(f"Deposit {tx_hash} moved from block {block_number} to {mined_in}")
+                    deposit = deposit._replace(block_number=mined_in)
+                    self.pending.add(deposit)
+                    rehomed.append(deposit)
+                    continue
+
+                settled.append(tx_hash)
+
+                if int(tx_receipt['status'], 16) != 1:
+                    logger.warning(f"Deposit {tx_hash} for deal {deal_id} reverted")
+                    continue
+
+                tx_hash_bytes = tx_hash_key(tx_hash)
+                self.processed_txs.add(tx_hash_bytes, block_number)
+                processed.append((tx_hash_bytes, block_number))
+
+                token_address = self.token_contracts[token].address
+                amount = from_base_units(value, self.metadata.decimals(token_address))
+                symbol = self.metadata.symbol(token_address)
+
+                payment_data = {
+                    'deal_id': deal_id,
+                    'tx_hash': tx_hash,
+                    'from_address': from_address,
+                    'amount': amount,
+                    'token': symbol,
+                    'confirmations': current_block - mined_in,
+                    'timestamp': datetime.fromtimestamp(timestamp)
+                }
+
+                detected_payments.append(payment_data)
+
+                # 🔔 GROUP NOTIFICATION
+                tx_link = self.get_transaction_link(tx_hash)
+                message = f"""
 💰 <b>New Deposit Received</b>
 
 🆔 <b>Deal:</b> {deal_id}
@@ -184,39 +604,55 @@ class BlockchainMonitorWeb3:
 
 🔗 <a href="{tx_link}">View on BscScan</a>
 """
-                        await send_group_notification(message)
+                send_group_notification(message)
 
-                        logger.info(f"Deposit detected & notified: {tx_hash}")
+                logger.info(f"Deposit detected & notified: {tx_hash}")
 
             except Exception as e:
-                logger.error(f"Error checking deal {deal_id}: {e}")
-
-        self.last_checked_block = to_block
-        return detected_payments
-
-    def _verify_transaction_web3(self, from_addr, to_addr, amount, symbol, deal_info, tx_receipt):
-        try:
-            if to_addr.lower() != ADMIN_WALLET_ADDRESS.lower():
-                return False
-
-            if from_addr.lower() != deal_info['seller_address'].lower():
-                return False
-
-            expected_amount = float(deal_info['amount'])
-
-            if abs(amount - expected_amount) > (expected_amount * 0.001):
-                return False
-
-            if symbol.upper() != deal_info['crypto'].upper():
-                return False
-
-            if tx_receipt['status'] != 1:
-                return False
-
-            return True
-        except Exception as e:
-            logger.error(f"Verify error: {e}")
-            return False
+                logger.error(f"Error processing deposit {tx_hash}: {e}")
+
+        return detected_payments, processed, settled, rehomed
+
+    def _advance_checkpoint(self, block_number, processed_txs=(), pending_added=(), pending_removed=()):
+        """Persist processed txs, pending changes and, if given, the new checkpoint together"""
+        self.store.commit_scan(block_number, processed_txs, pending_added, pending_removed)
+        if block_number is not None:
+            self.last_checked_block = block_number
+            # Blocks this far below the checkpoint are never scanned again
+            if self.processed_txs.prune(block_number):
+                self.store.prune_processed_txs(self.processed_txs.horizon(block_number))
+
+    async def _fetch_receipts_and_blocks(self, tx_hashes, block_numbers):
+        """
+        Fetch receipts and uncached block timestamps in one JSON-RPC batch
+
+        Returns:
+            dict: Receipts by tx hash, None for transactions the node doesn't
+            know; failed lookups are simply absent
+        """
+        block_numbers = sorted(
+            block_number for block_number in block_numbers
+            if self.metadata.get_block_timestamp(block_number) is None
+        )
+        calls = [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes]
+        calls += [("eth_getBlockByNumber", [hex(number), False]) for number in block_numbers]
+
+        results = await self.batcher.call_many(calls)
+
+        receipts = {}
+        for tx_hash, receipt in zip(tx_hashes, results[:len(tx_hashes)]):
+            if isinstance(receipt, RpcBatchError):
+                logger.error(f"Error fetching receipt {tx_hash}: {receipt}")
+                continue
+            receipts[tx_hash] = receipt
+
+        for block_number, block in zip(block_numbers, results[len(tx_hashes):]):
+            if isinstance(block, RpcBatchError) or block is None:
+                logger.error(f"Error fetching block {block_number}: {block}")
+                continue
+            self.metadata.put_block_timestamp(block_number, int(block['timestamp'], 16))
+
+        return receipts
 
     def get_transaction_link(self, tx_hash):
         return f"https://bscscan.com/tx/{tx_hash}"
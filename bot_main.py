@@ -1,18 +1,35 @@
 import asyncio
 import logging
+import signal
+import time
+from aiohttp import web
 from telegram import Update
 from telegram.ext import (
     Application,
     CommandHandler,
+    MessageHandler,
+    filters,
     ContextTypes
 )
 
 from config import (
     BOT_TOKEN,
-    POLLING_INTERVAL
+    POLLING_INTERVAL,
+    ROOM_POOL,
+    BOT_MODE,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PORT,
+    WEBHOOK_PATH,
+    WEBHOOK_URL,
+    WEBHOOK_SECRET_TOKEN
 )
 
+from auth_system import auth_system
+from balance_snapshot import balance_snapshot
 from blockchain_monitor_web3 import monitor
+from message_journal import message_journal
+from notification_outbox import outbox
+from rpc_client import rpc_client
 
 # =========================
 # Logging
@@ -33,10 +50,40 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     deals = len(monitor.monitored_deals)
+    mode = "push (WebSocket)" if monitor.stream_live else "polling"
+
+    endpoints = []
+    for endpoint in rpc_client.pool.health():
+        latency = "n/a" if endpoint['latency_ms'] is None else f"{endpoint['latency_ms']} ms"
+        icon = "🟢" if endpoint['state'] == "healthy" else "🔴"
+        endpoints.append(
+            f"{icon} {endpoint['name']} - {latency}, {endpoint['error_rate']:.0%} errors"
+        )
+
     await update.message.reply_text(
-        f"📊 Bot Status\n\nActive deals: {deals}"
+        f"📊 Bot Status\n\nActive deals: {deals}\nDetection: {mode}\n\n"
+        "RPC endpoints:\n" + "\n".join(endpoints)
     )
 
+async def balance(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not auth_system.is_owner(update.effective_user.id):
+        return
+
+    try:
+        snapshot = await balance_snapshot.get()
+    except Exception as e:
+        logger.error(f"Balance check error: {e}")
+        await update.message.reply_text("❌ Could not read wallet balances")
+        return
+
+    lines = []
+    for symbol in snapshot.tokens:
+        amount = await balance_snapshot.token_balance(symbol)
+        lines.append(f"{symbol}: {'unavailable' if amount is None else amount}")
+    lines.append(f"BNB: {await balance_snapshot.native_balance()}")
+
+    await update.message.reply_text("💰 Admin Wallet\n\n" + "\n".join(lines))
+
 # =========================
 # Background Job
 # =========================
@@ -54,25 +101,138 @@ async def check_payments(context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         logger.error(f"Payment check error: {e}")
 
+async def journal_room_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Remember every deal room message so cleanup can bulk-delete it
+    message_journal.record(update.effective_chat.id, update.effective_message.message_id)
+
+# =========================
+# Startup / Shutdown
+# =========================
+async def on_startup(app: Application):
+    # Notifications from the monitor and room manager share the app's bot
+    outbox.bind(app.bot)
+
+    # Push-mode deposit detection; polling via the job queue keeps running
+    # and covers any socket outage
+    app.bot_data["stream_task"] = asyncio.create_task(monitor.run_stream())
+
+async def on_stop(app: Application):
+    task = app.bot_data.pop("stream_task", None)
+    if task:
+        task.cancel()
+
+    # Give queued notifications a chance to go out while the bot is still up
+    await outbox.drain()
+
+    # The HTTP session is bound to this event loop; a restart runs on a new one
+    await rpc_client.close()
+
 # =========================
 # Setup Handlers
 # =========================
 def setup_handlers(app: Application):
     app.add_handler(CommandHandler("start", start))
-    app = Application.builder().token(BOT_TOKEN).build()
     app.add_handler(CommandHandler("status", status))
+    app.add_handler(CommandHandler("balance", balance))
+
+    # Own group so commands in the rooms are still handled as usual
+    app.add_handler(
+        MessageHandler(filters.Chat(chat_id=ROOM_POOL) & filters.UpdateType.MESSAGE, journal_room_message),
+        group=-1
+    )
+
+# =========================
+# Update Delivery
+# =========================
+def run(app: Application):
+    if BOT_MODE != "webhook":
+        # Also removes any webhook left registered from a webhook deployment
+        app.run_polling(allowed_updates=Update.ALL_TYPES)
+        return
+
+    if not WEBHOOK_URL:
+        # PTB's run_webhook always calls setWebhook, so local runs use our
+        # own receiver and leave the production webhook alone
+        asyncio.run(run_local_webhook(app))
+        return
+
+    # Telegram echoes the secret in X-Telegram-Bot-Api-Secret-Token; anything
+    # posted without it is rejected with 403 before it reaches a handler
+    app.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=WEBHOOK_PATH,
+        webhook_url=f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET_TOKEN,
+        allowed_updates=Update.ALL_TYPES
+    )
+
+async def run_local_webhook(app: Application):
+    """Serve the webhook endpoint without registering it with Telegram"""
+    async def receive(request):
+        if request.headers.get("X-Telegram-Bot-Api-Secret-Token") != WEBHOOK_SECRET_TOKEN:
+            return web.Response(status=403, text="Request had the wrong secret token")
+        try:
+            update = Update.de_json(await request.json(), app.bot)
+        except Exception as e:
+            return web.Response(status=400, text=f"Invalid update: {e}")
+        await app.update_queue.put(update)
+        return web.Response()
+
+    server = web.Application()
+    server.router.add_post(f"/{WEBHOOK_PATH}", receive)
+    runner = web.AppRunner(server)
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopped.set)
+        except NotImplementedError:
+            # Windows has no loop signal handlers; Ctrl+C raises
+            # KeyboardInterrupt instead, which cancels this coroutine and
+            # still runs the shutdown below
+            break
+
+    # Same lifecycle (and hooks) as run_polling / run_webhook
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    await app.start()
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_LISTEN, WEBHOOK_PORT).start()
+    logger.info(f"Local webhook receiver on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH} (not registered)")
+    try:
+        await stopped.wait()
+    finally:
+        await runner.cleanup()
+        await app.stop()
+        if app.post_stop:
+            await app.post_stop(app)
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
 
 # =========================
 # MAIN (ANTI-CRASH LOOP)
 # =========================
 def main():
+    if BOT_MODE not in ("polling", "webhook"):
+        raise ValueError(f"BOT_MODE must be 'polling' or 'webhook', not {BOT_MODE!r}")
+    if BOT_MODE == "webhook" and not WEBHOOK_SECRET_TOKEN:
+        raise ValueError("WEBHOOK_SECRET_TOKEN must be set in webhook mode")
+
     while True:
         try:
-            logger.info("🚀 Starting bot...")
+            logger.info(f"🚀 Starting bot ({BOT_MODE})...")
 
-            app = Application.builder().token(
-                TELEGRAM_BOT_TOKEN
-            ).build()
+            app = (
+                Application.builder()
+                .token(BOT_TOKEN)
+                .post_init(on_startup)
+                .post_stop(on_stop)
+                .build()
+            )
 
             setup_handlers(app)
 
@@ -83,12 +243,12 @@ def main():
                     first=10
                 )
 
-            app.run_polling(allowed_updates=Update.ALL_TYPES)
+            run(app)
 
         except Exception as e:
             logger.error(f"❌ Bot crashed: {e}")
             logger.info("♻️ Restarting bot in 5 seconds...")
-            asyncio.sleep(5)
+            time.sleep(5)
 
 # =========================
 # Entry Point
@@ -0,0 +1,102 @@
+"""
+Chain Metadata Cache - Token decimals/symbols and block timestamps
+
+Token metadata never changes for the tokens we support, so it is read once
+per token and optionally persisted to disk for cold starts. Block timestamps
+are kept in a bounded LRU keyed by block number.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+
+from config import METADATA_CACHE_FILE, BLOCK_TIMESTAMP_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class ChainMetadataCache:
+    def __init__(self, path=METADATA_CACHE_FILE, max_blocks=BLOCK_TIMESTAMP_CACHE_SIZE):
+        self.path = path
+        self.max_blocks = max_blocks
+        # token address (lower-case) -> {'symbol': str, 'decimals': int}
+        self.tokens = {}
+        # block number -> unix timestamp, least recently used first
+        self.block_timestamps = OrderedDict()
+
+        self._load_file()
+
+    def _load_file(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.tokens = json.load(f).get("tokens", {})
+            logger.info(f"Loaded metadata for {len(self.tokens)} tokens from {self.path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable metadata cache {self.path}: {e}")
+            self.tokens = {}
+
+    def _save_file(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"tokens": self.tokens}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist metadata cache: {e}")
+
+    async def load_tokens(self, contracts, rpc):
+        """
+        Make sure decimals and symbol are known for every token contract
+
+        Args:
+            contracts: Iterable of web3 token contract handles
+            rpc: Coroutine wrapper used to issue the calls (e.g. a semaphore guard)
+        """
+        missing = [c for c in contracts if c.address.lower() not in self.tokens]
+        if not missing:
+            return
+
+        results = await asyncio.gather(*(
+            asyncio.gather(
+                rpc(contract.functions.decimals().call()),
+                rpc(contract.functions.symbol().call())
+            )
+            for contract in missing
+        ))
+
+        for contract, (decimals, symbol) in zip(missing, results):
+            self.tokens[contract.address.lower()] = {
+                "symbol": symbol,
+                "decimals": int(decimals)
+            }
+            logger.info(f"Token metadata cached: {symbol} ({decimals} decimals)")
+
+        self._save_file()
+
+    def decimals(self, token_address):
+        return self.tokens[token_address.lower()]["decimals"]
+
+    def symbol(self, token_address):
+        return self.tokens[token_address.lower()]["symbol"]
+
+    def get_block_timestamp(self, block_number):
+        timestamp = self.block_timestamps.get(block_number)
+        if timestamp is not None:
+            self.block_timestamps.move_to_end(block_number)
+        return timestamp
+
+    def forget_blocks_from(self, block_number):
+        """Drop cached timestamps of blocks that may have been orphaned"""
+        for cached in [n for n in self.block_timestamps if n >= block_number]:
+            del self.block_timestamps[cached]
+
+    def put_block_timestamp(self, block_number, timestamp):
+        self.block_timestamps[block_number] = timestamp
+        self.block_timestamps.move_to_end(block_number)
+        while len(self.block_timestamps) > self.max_blocks:
+            self.block_timestamps.popitem(last=False)
@@ -1,48 +1,96 @@
 """
 Cleanup Script - Clear all deal rooms and delete unwanted files
+
+Rooms are cleaned concurrently (--concurrency at a time) and Telegram flood
+control is waited out per call. --dry-run only reports what would happen.
 """
+import argparse
 import os
 import asyncio
+import time
 from telegram import Bot
-from config import BOT_TOKEN, ROOM_POOL
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
+from config import BOT_TOKEN, ROOM_POOL, CLEANUP_CONCURRENCY
+from message_journal import message_journal
 
-async def cleanup_rooms():
-    """Clear all messages from deal rooms"""
-    bot = Bot(token=BOT_TOKEN)
-    
-    print("=" * 60)
-    print("CLEANING UP DEAL ROOMS")
-    print("=" * 60)
-    
-    for room_id in ROOM_POOL:
+MAX_FLOOD_WAITS = 5
+
+async def with_flood_retry(call, *args, **kwargs):
+    """Run a Bot call, sleeping through flood control (429) answers"""
+    for attempt in range(MAX_FLOOD_WAITS):
         try:
-            print(f"\nCleaning room: {room_id}")
-            
-            # Get chat info
-            chat = await bot.get_chat(room_id)
-            print(f"  Room name: {chat.title}")
-            
-            # Delete all messages (Telegram doesn't allow bulk delete, so we skip this)
-            # Instead, we'll just send a cleanup message
-            await bot.send_message(
-                room_id,
-                "🧹 *Room Cleaned*\n\nAll previous deals cleared.\nRoom is now available for new deals.",
-                parse_mode="Markdown"
-            )
+            return await call(*args, **kwargs)
+        except RetryAfter as e:
+            if attempt == MAX_FLOOD_WAITS - 1:
+                raise
+            retry_after = e.retry_after
+            delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after
+            await asyncio.sleep(delay)
+
+async def cleanup_room(bot, room_id, semaphore, dry_run):
+    """Clean one room, returning a summary row instead of printing (rooms run interleaved)"""
+    async with semaphore:
+        started = time.perf_counter()
+        result = {"room_id": room_id, "title": "?", "deleted": 0, "pending": message_journal.count(room_id)}
+        try:
+            chat = await with_flood_retry(bot.get_chat, room_id)
+            result["title"] = chat.title
             
-            print(f"  ✅ Cleanup message sent")
+            if not dry_run:
+                # Delete every journaled message, 100 per call
+                result["deleted"] = await message_journal.purge(bot, room_id)
+                
+                notice = await with_flood_retry(
+                    bot.send_message,
+                    room_id,
+                    "🧹 *Room Cleaned*\n\nAll previous deals cleared.\nRoom is now available for new deals.",
+                    parse_mode="Markdown"
+                )
+                # So the next cleanup removes the notice too
+                message_journal.record(room_id, notice.message_id)
             
+            result["status"] = "✅"
         except Exception as e:
-            print(f"  ❌ Error: {e}")
+            result["status"] = f"❌ {e}"
+        
+        result["seconds"] = time.perf_counter() - started
+        return result
+
+async def cleanup_rooms(concurrency=CLEANUP_CONCURRENCY, dry_run=False):
+    """Clear all messages from deal rooms"""
+    print("=" * 60)
+    print("CLEANING UP DEAL ROOMS" + (" (DRY RUN)" if dry_run else ""))
+    print("=" * 60)
+    
+    # One connection per concurrent room (the default pool holds just one)
+    bot = Bot(token=BOT_TOKEN, request=HTTPXRequest(connection_pool_size=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    
+    async with bot:
+        results = await asyncio.gather(
+            *(cleanup_room(bot, room_id, semaphore, dry_run) for room_id in ROOM_POOL)
+        )
+    
+    print(f"\n  {'Room':<16} {'Name':<24} {'Messages':>10} {'Time':>8}  Status")
+    for result in results:
+        messages = f"{result['pending']}" if dry_run else f"{result['deleted']}/{result['pending']}"
+        print(f"  {result['room_id']:<16} {str(result['title'])[:24]:<24} {messages:>10} "
+              f"{result['seconds']:>7.2f}s  {result['status']}")
+    
+    failed = sum(1 for result in results if result["status"] != "✅")
+    print(f"\n  {len(results)} rooms in {time.perf_counter() - started:.2f}s "
+          f"(concurrency {concurrency}), {failed} failed")
     
     print("\n" + "=" * 60)
     print("CLEANUP COMPLETE")
     print("=" * 60)
 
-def delete_unwanted_files():
+def delete_unwanted_files(dry_run=False):
     """Delete test files and temporary files"""
     print("\n" + "=" * 60)
-    print("DELETING UNWANTED FILES")
+    print("DELETING UNWANTED FILES" + (" (DRY RUN)" if dry_run else ""))
     print("=" * 60)
     
     # List of files to delete
@@ -84,7 +132,10 @@ def delete_unwanted_files():
     deleted_count = 0
     for filename in unwanted_files:
         filepath = os.path.join(os.path.dirname(__file__), filename)
-        if os.path.exists(filepath):
+        if os.path.exists(filepath) and dry_run:
+            print(f"  🔎 Would delete: {filename}")
+            deleted_count += 1
+        elif os.path.exists(filepath):
             try:
                 os.remove(filepath)
                 print(f"  ✅ Deleted: {filename}")
@@ -98,6 +149,13 @@ def delete_unwanted_files():
     print("=" * 60)
 
 async def main():
+    parser = argparse.ArgumentParser(description="Clear all deal rooms and delete unwanted files")
+    parser.add_argument("--concurrency", type=int, default=CLEANUP_CONCURRENCY,
+                        help=f"rooms cleaned at once (default {CLEANUP_CONCURRENCY})")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report what would be deleted without touching anything")
+    args = parser.parse_args()
+    
     print("\n🧹 COMPLETE CLEANUP SCRIPT")
     print("This will:")
     print("1. Clear all deal room messages")
@@ -105,10 +163,14 @@ async def main():
     print("\n")
     
     # Cleanup rooms
-    await cleanup_rooms()
+    await cleanup_rooms(concurrency=max(1, args.concurrency), dry_run=args.dry_run)
     
     # Delete files
-    delete_unwanted_files()
+    delete_unwanted_files(dry_run=args.dry_run)
+    
+    if args.dry_run:
+        print("\n🔎 DRY RUN COMPLETE - nothing was changed")
+        return
     
     print("\n✅ ALL CLEANUP COMPLETE!")
     print("\nYour bot is now clean and ready for production!")
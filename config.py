@@ -13,14 +13,75 @@ OWNER_ID = 6290766183  # Your Telegram user ID
 API_ID = "384128ba89c089c700ab54cb6ef141f6"
 API_HASH = "32535292"
 
+# Update Delivery
+# webhook: Telegram pushes updates to WEBHOOK_URL/WEBHOOK_PATH instead of the bot long-polling
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()  # polling | webhook
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8443))  # Telegram only pushes to 443, 80, 88 or 8443 (or via a proxy)
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # Public https base URL; empty serves locally without registering a webhook
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")  # Required in webhook mode; 1-256 chars of A-Z a-z 0-9 _ -
+
 # Blockchain Configuration (from .env)
 ADMIN_WALLET_ADDRESS = os.getenv("ADMIN_WALLET_ADDRESS")
 ADMIN_WALLET_PRIVATE_KEY = os.getenv("ADMIN_WALLET_PRIVATE_KEY")
 BSCSCAN_API_KEY = os.getenv("BSCSCAN_API_KEY")
 BSC_RPC_URL = os.getenv("BSC_RPC_URL")
+BSC_WS_URL = os.getenv("BSC_WS_URL")  # Optional wss:// endpoint for push mode
+STREAM_STALE_SECONDS = float(os.getenv("STREAM_STALE_SECONDS", 15))  # No new head for this long: back to polling and reconnect
 CONFIRMATION_BLOCKS = int(os.getenv("CONFIRMATION_BLOCKS", 15))
+DEPOSIT_RECEIPT_RETRIES = int(os.getenv("DEPOSIT_RECEIPT_RETRIES", 20))  # Scans a confirmed deposit may go without a receipt before it is dropped
 POLLING_INTERVAL = int(os.getenv("POLLING_INTERVAL", 15))
 MAX_GAS_PRICE = int(os.getenv("MAX_GAS_PRICE", 10))
+NONCE_IDLE_RESYNC_SECONDS = int(os.getenv("NONCE_IDLE_RESYNC_SECONDS", 300))  # Re-read nonce after idling
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", 3))  # Seconds between payout receipt polls
+RECEIPT_TIMEOUT = int(os.getenv("RECEIPT_TIMEOUT", 120))
+PAYOUT_BATCH_WINDOW = float(os.getenv("PAYOUT_BATCH_WINDOW", 2))  # Seconds the payout queue collects before sending
+PAYOUT_BATCH_MAX = int(os.getenv("PAYOUT_BATCH_MAX", 20))
+RPC_MAX_CONCURRENCY = int(os.getenv("RPC_MAX_CONCURRENCY", 8))  # In-flight RPC calls per scan
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", 50))  # Calls per JSON-RPC batch request
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", 32))  # Keep-alive connections in the shared RPC session
+RPC_KEEPALIVE_SECONDS = float(os.getenv("RPC_KEEPALIVE_SECONDS", 60))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", 30))  # Seconds per HTTP request to the RPC node
+
+# RPC Endpoint Pool
+# Comma-separated endpoints; falls back to BSC_RPC_URL alone
+BSC_RPC_URLS = [url.strip() for url in os.getenv("BSC_RPC_URLS", "").split(",") if url.strip()] or [BSC_RPC_URL]
+RPC_HEDGE_DELAY = float(os.getenv("RPC_HEDGE_DELAY", 0.5))  # Min seconds before a slow read also goes to a 2nd endpoint
+RPC_EJECT_ERROR_RATE = float(os.getenv("RPC_EJECT_ERROR_RATE", 0.5))  # Error rate that takes an endpoint out of rotation
+RPC_EJECT_SECONDS = float(os.getenv("RPC_EJECT_SECONDS", 30))  # First wait before re-probing an ejected endpoint
+
+# Gas Oracle
+GAS_PRICE_TTL = float(os.getenv("GAS_PRICE_TTL", 10))  # Seconds a cached gas price is used before refreshing
+GAS_PRICE_MAX_AGE = float(os.getenv("GAS_PRICE_MAX_AGE", 60))  # Older prices are refreshed before use
+GAS_ESTIMATE_TTL = float(os.getenv("GAS_ESTIMATE_TTL", 3600))  # Seconds a cached transfer estimate is reused
+GAS_LIMIT_MARGIN = float(os.getenv("GAS_LIMIT_MARGIN", 1.25))  # Safety factor on estimated gas
+
+# Balance Snapshot
+MULTICALL3_ADDRESS = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+BALANCE_SNAPSHOT_TTL = float(os.getenv("BALANCE_SNAPSHOT_TTL", 30))  # Max age of cached admin balances
+
+# Log Range Scanning
+SCAN_START_LOOKBACK = int(os.getenv("SCAN_START_LOOKBACK", 100))  # Blocks scanned back when no checkpoint exists
+SCAN_CHUNK_SIZE = int(os.getenv("SCAN_CHUNK_SIZE", 2000))  # Initial eth_getLogs block range
+SCAN_MAX_CHUNK_SIZE = int(os.getenv("SCAN_MAX_CHUNK_SIZE", 5000))
+SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", 4))  # Chunks fetched at once
+SCAN_TARGET_SECONDS = float(os.getenv("SCAN_TARGET_SECONDS", 2.0))  # Shrink chunks slower than this
+SCAN_CHUNK_TIMEOUT = float(os.getenv("SCAN_CHUNK_TIMEOUT", 20.0))
+
+# Chain Metadata Cache
+METADATA_CACHE_FILE = os.getenv("METADATA_CACHE_FILE", "chain_metadata.json")  # Empty disables persistence
+BLOCK_TIMESTAMP_CACHE_SIZE = int(os.getenv("BLOCK_TIMESTAMP_CACHE_SIZE", 1024))
+
+# Monitor State (checkpoint, processed transactions, active deals)
+MONITOR_DB_PATH = os.getenv("MONITOR_DB_PATH", "monitor_state.db")
+REORG_SAFETY_DEPTH = int(os.getenv("REORG_SAFETY_DEPTH", 64))  # Blocks kept below the checkpoint for dedup
+
+# Telegram Outbox (Telegram allows ~30 msg/s overall, 20 msg/min per group)
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 25))  # Messages per second across all chats
+TELEGRAM_GROUP_RATE = float(os.getenv("TELEGRAM_GROUP_RATE", 18))  # Messages per minute per group
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))  # Messages per second per private chat
+OUTBOX_COALESCE_WINDOW = float(os.getenv("OUTBOX_COALESCE_WINDOW", 1.0))  # Seconds a burst gathers before sending
 
 # Fee Configuration
 DEFAULT_FEE = 0.25  # 0.25%
@@ -39,10 +100,17 @@ ROOM_POOL = [
     -1001234567892,  # Deal room 3
     # Add more group IDs as you create more deal rooms (15-20 total recommended)
 ]
+ROOM_POOL_STATE_FILE = os.getenv("ROOM_POOL_STATE_FILE", "room_pool.json")  # Empty disables persistence
+ROOM_LEASE_HOURS = float(os.getenv("ROOM_LEASE_HOURS", 48))  # Unreleased rooms return to the pool after this
+CLEANUP_CONCURRENCY = int(os.getenv("CLEANUP_CONCURRENCY", 5))  # Rooms cleaned at once by cleanup_all.py
+MESSAGE_JOURNAL_DIR = os.getenv("MESSAGE_JOURNAL_DIR", "message_journal")  # Per-room message IDs for cleanup; empty keeps them in memory
 
 # Main group where deals are initiated
 MAIN_GROUP_ID = -1001234567890  # Your main group ID
 
+# Group where deposit notifications are posted
+GROUP_CHAT_ID = int(os.getenv("GROUP_CHAT_ID", MAIN_GROUP_ID))
+
 # Supported Cryptocurrencies (BEP20/BSC ONLY)
 SUPPORTED_CRYPTOS = ["USDT", "USDC"]
 
@@ -0,0 +1,103 @@
+"""
+Deal Index - Match incoming deposits to monitored deals
+
+Deals are keyed by (token contract, seller address). Each key holds the
+expected amounts as exact integer base units in sorted order, so a decoded
+Transfer log is matched with a bisect and no float arithmetic.
+"""
+import bisect
+from decimal import Decimal
+
+# Accepted difference between expected and received amount (0.1%)
+AMOUNT_TOLERANCE_PPM = 1000
+
+
+def to_base_units(amount, decimals):
+    """Convert a human amount (e.g. '100.5') to integer token base units"""
+    return int(Decimal(str(amount)).scaleb(decimals))
+
+
+def from_base_units(value, decimals):
+    """Convert integer token base units back to an exact Decimal amount"""
+    amount = Decimal(value).scaleb(-decimals)
+    # Drop trailing zeros without switching to exponent notation
+    return amount.quantize(Decimal(1)) if amount == amount.to_integral() else amount.normalize()
+
+
+class DealIndex:
+    def __init__(self, tolerance_ppm=AMOUNT_TOLERANCE_PPM):
+        self.tolerance_ppm = tolerance_ppm
+        # (token, seller) -> ([amounts sorted], [deal ids in the same order])
+        self._buckets = {}
+        # deal_id -> ((token, seller), amount)
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, deal_id):
+        return deal_id in self._entries
+
+    def add(self, deal_id, token_address, seller_address, amount_units):
+        """Index a deal, replacing any previous entry for the same deal_id"""
+        self.remove(deal_id)
+
+        key = (token_address.lower(), seller_address.lower())
+        amounts, deal_ids = self._buckets.setdefault(key, ([], []))
+
+        position = bisect.bisect_right(amounts, amount_units)
+        amounts.insert(position, amount_units)
+        deal_ids.insert(position, deal_id)
+
+        self._entries[deal_id] = (key, amount_units)
+
+    def remove(self, deal_id):
+        """Drop a deal from the index. Returns True if it was indexed."""
+        entry = self._entries.pop(deal_id, None)
+        if entry is None:
+            return False
+
+        key, amount_units = entry
+        amounts, deal_ids = self._buckets[key]
+
+        position = bisect.bisect_left(amounts, amount_units)
+        while deal_ids[position] != deal_id:
+            position += 1
+        del amounts[position]
+        del deal_ids[position]
+
+        if not amounts:
+            del self._buckets[key]
+        return True
+
+    def match(self, token_address, from_address, value):
+        """
+        Find the deal whose expected amount is closest to `value`
+
+        Args:
+            token_address: Contract that emitted the Transfer log
+            from_address: Sender of the transfer
+            value: Transferred amount in base units
+
+        Returns:
+            The matching deal_id, or None
+        """
+        bucket = self._buckets.get((token_address.lower(), from_address.lower()))
+        if bucket is None:
+            return None
+
+        amounts, deal_ids = bucket
+        scale = 1_000_000
+
+        # |value - expected| <= expected * tolerance
+        # <=> value * scale / (scale + tol) <= expected <= value * scale / (scale - tol)
+        low = -(-value * scale // (scale + self.tolerance_ppm))
+        high = value * scale // (scale - self.tolerance_ppm)
+
+        start = bisect.bisect_left(amounts, low)
+        end = bisect.bisect_right(amounts, high)
+        if start == end:
+            return None
+
+        best = min(range(start, end), key=lambda i: abs(amounts[i] - value))
+        return deal_ids[best]
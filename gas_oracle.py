@@ -0,0 +1,106 @@
+"""
+Gas Oracle - Cached gas price and transfer gas limits
+
+The gas price is cached for a short TTL; once it expires the cached value is
+still served while a single background task fetches a fresh one, so a payout
+only waits on the node when the price is missing or very old. Transfer gas
+limits are estimated once per (token, recipient-is-new) class - paying a
+wallet with no balance writes a fresh storage slot and costs more - and
+padded with a safety margin.
+"""
+import asyncio
+import logging
+import time
+
+from config import (
+    GAS_PRICE_TTL,
+    GAS_PRICE_MAX_AGE,
+    GAS_ESTIMATE_TTL,
+    GAS_LIMIT_MARGIN,
+    MAX_GAS_PRICE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GasOracle:
+    def __init__(self, w3, fallback_gas_limit, ttl=GAS_PRICE_TTL, max_age=GAS_PRICE_MAX_AGE,
+                 estimate_ttl=GAS_ESTIMATE_TTL, margin=GAS_LIMIT_MARGIN):
+        """
+        Args:
+            w3: AsyncWeb3 instance
+            fallback_gas_limit: Gas limit used when a transfer can't be estimated
+        """
+        self.w3 = w3
+        self.fallback_gas_limit = fallback_gas_limit
+        self.ttl = ttl
+        self.max_age = max_age
+        self.estimate_ttl = estimate_ttl
+        self.margin = margin
+        self.max_gas_price = w3.to_wei(MAX_GAS_PRICE, 'gwei')
+
+        self._price = None
+        self._price_at = 0.0
+        self._refresh_task = None
+        # (token symbol, recipient is new) -> (gas limit, estimated at)
+        self._limits = {}
+
+    # ---- gas price ----
+
+    async def gas_price(self):
+        """Current gas price in wei, clamped to MAX_GAS_PRICE"""
+        age = time.monotonic() - self._price_at
+        if self._price is None or age > self.max_age:
+            await self._refresh_price()
+        elif age > self.ttl and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_price_quietly())
+        return self._price
+
+    async def _refresh_price(self):
+        price = await self.w3.eth.gas_price
+        if price > self.max_gas_price:
+            logger.warning(f"Gas price too high: {self.w3.from_wei(price, 'gwei')} gwei")
+            price = self.max_gas_price
+        self._price = price
+        self._price_at = time.monotonic()
+
+    async def _refresh_price_quietly(self):
+        try:
+            await self._refresh_price()
+        except Exception as e:
+            logger.warning(f"Background gas price refresh failed: {e}")
+
+    # ---- gas limits ----
+
+    async def transfer_gas_limit(self, token, transaction, recipient_is_new):
+        """
+        Gas limit for a token transfer
+
+        Args:
+            token: TokenInfo being transferred
+            transaction: Unsigned transaction dict (from, to, data) used when
+                the class has no fresh estimate yet
+            recipient_is_new: Whether the recipient currently holds none of the token
+
+        Returns:
+            int: Estimated gas with the safety margin applied
+        """
+        key = (token.symbol, recipient_is_new)
+        cached = self._limits.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.estimate_ttl:
+            return cached[0]
+
+        try:
+            estimate = await self.w3.eth.estimate_gas(transaction)
+        except Exception as e:
+            # Don't cache: the failure may be specific to this transfer
+            logger.warning(f"Gas estimate failed for {token.symbol}, using {self.fallback_gas_limit}: {e}")
+            return self.fallback_gas_limit
+
+        gas_limit = int(estimate * self.margin)
+        self._limits[key] = (gas_limit, time.monotonic())
+        logger.info(
+            f"Gas limit for {token.symbol} transfers to {'new' if recipient_is_new else 'funded'} "
+            f"wallets: {gas_limit} (estimated {estimate})"
+        )
+        return gas_limit
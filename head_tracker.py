@@ -0,0 +1,85 @@
+"""
+Head Tracker - Detect chain reorganizations from block hashes
+
+Keeps the hashes of the last K blocks in a fixed-size ring buffer indexed by
+block number. A header whose parent hash (or own hash) disagrees with what
+was recorded means the chain reorganized; the fork point is then found by
+walking back and comparing recorded hashes with the canonical chain.
+"""
+import logging
+
+from config import REORG_SAFETY_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+class HeadTracker:
+    def __init__(self, size=REORG_SAFETY_DEPTH):
+        self.size = size
+        self._numbers = [None] * size
+        self._hashes = [None] * size
+        self.head = None
+
+    def get(self, number):
+        """Recorded hash for a block number, or None if it is not in the ring"""
+        slot = number % self.size
+        if self._numbers[slot] == number:
+            return self._hashes[slot]
+        return None
+
+    def _put(self, number, block_hash):
+        slot = number % self.size
+        self._numbers[slot] = number
+        self._hashes[slot] = block_hash
+
+    def record(self, number, block_hash, parent_hash=None):
+        """
+        Record a header
+
+        Returns:
+            The highest block number known to be orphaned, or None if the
+            header extends the recorded chain
+        """
+        suspect = None
+
+        known = self.get(number)
+        if known is not None and known != block_hash:
+            suspect = number
+
+        known_parent = self.get(number - 1)
+        if parent_hash is not None and known_parent is not None and known_parent != parent_hash:
+            suspect = number - 1
+
+        self._put(number, block_hash)
+        if self.head is None or number > self.head or suspect is not None:
+            self.head = number
+        return suspect
+
+    async def find_fork(self, suspect, fetch_hash):
+        """
+        Find the first orphaned block at or below `suspect`
+
+        Args:
+            suspect: A block number whose recorded hash is known to be stale
+            fetch_hash: Coroutine function returning the canonical hash of a block
+
+        Returns:
+            int: Lowest block number that must be treated as orphaned
+        """
+        number = suspect
+        lowest = (self.head or suspect) - self.size + 1
+
+        # BSC reorgs are a few blocks deep, so walking back one header at a
+        # time costs only a handful of lookups
+        while number >= lowest:
+            recorded = self.get(number)
+            if recorded is None:
+                break
+            canonical = await fetch_hash(number)
+            if canonical == recorded:
+                return number + 1
+            self._put(number, canonical)
+            number -= 1
+
+        logger.warning(f"Reorg deeper than tracked history, rewinding to block {number + 1}")
+        return number + 1
@@ -0,0 +1,120 @@
+"""
+Log Subscriber - Push-based block and Transfer log feed over WebSocket
+
+Subscribes to `newHeads` and to filtered Transfer `logs` with eth_subscribe.
+While the socket is live the monitor reads heads and logs from here instead
+of polling; when it drops, `live` goes False and the monitor falls back to
+the polling path until the subscription is re-established. A socket that
+stays open but stops delivering heads is treated as dropped.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+
+import websockets
+
+from config import STREAM_STALE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LogSubscriber:
+    def __init__(self, url, log_filter, on_head, on_log, max_backoff=30, stale_after=STREAM_STALE_SECONDS):
+        """
+        Args:
+            url: WebSocket JSON-RPC endpoint (wss://...)
+            log_filter: eth_subscribe "logs" filter (address list + topics)
+            on_head: Coroutine function called with each raw newHeads header
+            on_log: Callable called with each raw log notification
+            stale_after: Seconds without a new head before reconnecting
+        """
+        self.url = url
+        self.log_filter = log_filter
+        self.on_head = on_head
+        self.on_log = on_log
+        self.max_backoff = max_backoff
+        self.stale_after = stale_after
+        self._last_head_at = None
+
+        self.live = False
+        # First head received on the current subscription; logs from this
+        # block onward are guaranteed to have been pushed
+        self.covered_from = None
+        self._ids = itertools.count(1)
+
+    async def _call(self, ws, method, params, early):
+        """
+        Send a request and wait for its response
+
+        Notifications from subscriptions made earlier on this socket can
+        arrive before the response; they are appended to `early`.
+        """
+        request_id = next(self._ids)
+        await ws.send(json.dumps({
+            "jsonrpc": "2.0", "id": request_id, "method": method, "params": params
+        }))
+        while True:
+            message = json.loads(await ws.recv())
+            if message.get("id") == request_id:
+                break
+            early.append(message)
+        if "error" in message:
+            raise Exception(f"{method} failed: {message['error']}")
+        return message["result"]
+
+    async def _dispatch(self, message, heads_id, logs_id, can_go_live=True):
+        if message.get("method") != "eth_subscription":
+            return
+
+        params = message["params"]
+        if params["subscription"] == logs_id:
+            self.on_log(params["result"])
+        elif params["subscription"] == heads_id:
+            header = params["result"]
+            if not self.live and can_go_live:
+                self.covered_from = int(header["number"], 16)
+                self.live = True
+            self._last_head_at = time.monotonic()
+            await self.on_head(header)
+
+    async def _listen(self):
+        async with websockets.connect(self.url, ping_interval=20) as ws:
+            early = []
+            self._last_head_at = time.monotonic()
+            heads_id = await self._call(ws, "eth_subscribe", ["newHeads"], early)
+            logs_id = await self._call(ws, "eth_subscribe", ["logs", self.log_filter], early)
+            logger.info(f"Subscribed to newHeads and Transfer logs on {self.url}")
+
+            # Heads that beat the logs subscription may have had their logs
+            # missed, so they don't start coverage
+            for message in early:
+                await self._dispatch(message, heads_id, logs_id, can_go_live=False)
+
+            while True:
+                # Pings can keep a socket open after the provider stopped pushing
+                remaining = self._last_head_at + self.stale_after - time.monotonic()
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    raise Exception(f"no new head for {self.stale_after:.0f}s") from None
+                await self._dispatch(json.loads(raw), heads_id, logs_id)
+
+    async def run(self):
+        """Keep the subscription alive forever, reconnecting with backoff"""
+        backoff = 1
+        while True:
+            try:
+                await self._listen()
+                backoff = 1
+            except asyncio.CancelledError:
+                self.live = False
+                raise
+            except Exception as e:
+                logger.warning(f"Log subscription dropped, falling back to polling: {e}")
+
+            self.live = False
+            self.covered_from = None
+            await asyncio.sleep(backoff)
+            backoff = min(self.max_backoff, backoff * 2)
@@ -0,0 +1,132 @@
+"""
+Message Journal - Per-room record of message IDs for bulk purging
+
+Telegram gives bots no way to list a chat's history, so every message seen
+in a deal room (incoming updates and the bot's own sends) has its ID
+appended to a compact array for that room, mirrored to an append-only file
+of 8-byte integers. Cleanup then deletes the whole room with deleteMessages,
+100 IDs per call.
+
+The bot only sees every group message if it is a room admin (or privacy
+mode is off), which it needs to be anyway to delete them.
+"""
+import asyncio
+import logging
+import os
+from array import array
+
+from telegram.constants import BulkRequestLimit
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from config import ROOM_POOL, MESSAGE_JOURNAL_DIR
+
+logger = logging.getLogger(__name__)
+
+ID_TYPECODE = "q"
+DELETE_CHUNK = BulkRequestLimit.MAX_LIMIT  # IDs per deleteMessages call
+MAX_FLOOD_WAITS = 5
+
+
+class MessageJournal:
+    def __init__(self, rooms=ROOM_POOL, path=MESSAGE_JOURNAL_DIR):
+        self.rooms = set(rooms)
+        self.path = path
+        # room_id -> array of message IDs, loaded on first use
+        self._journals = {}
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, room_id):
+        return os.path.join(self.path, f"{room_id}.ids")
+
+    def _journal(self, room_id):
+        journal = self._journals.get(room_id)
+        if journal is None:
+            journal = array(ID_TYPECODE)
+            if self.path and os.path.exists(self._file(room_id)):
+                with open(self._file(room_id), "rb") as f:
+                    data = f.read()
+                # Drop a torn trailing write
+                data = data[:len(data) - len(data) % journal.itemsize]
+                journal.frombytes(data)
+            self._journals[room_id] = journal
+        return journal
+
+    def _rewrite(self, room_id):
+        if not self.path:
+            return
+        tmp_path = f"{self._file(room_id)}.tmp"
+        with open(tmp_path, "wb") as f:
+            self._journals[room_id].tofile(f)
+        os.replace(tmp_path, self._file(room_id))
+
+    def record(self, chat_id, message_id):
+        """Append a message ID if the chat is a deal room"""
+        if chat_id not in self.rooms:
+            return
+        journal = self._journal(chat_id)
+        journal.append(message_id)
+        if self.path:
+            try:
+                with open(self._file(chat_id), "ab") as f:
+                    f.write(journal[-1:].tobytes())
+            except OSError as e:
+                logger.warning(f"Could not journal message {message_id} in room {chat_id}: {e}")
+
+    def count(self, room_id):
+        return len(self._journal(room_id))
+
+    async def purge(self, bot, room_id):
+        """
+        Delete every journaled message in a room
+
+        Args:
+            bot: Bot to delete with (must be a room admin)
+            room_id: The chat ID of the deal room
+
+        Returns:
+            int: Number of message IDs dropped from the journal
+        """
+        journal = self._journal(room_id)
+        # Messages journaled while purging are kept for the next cleanup
+        snapshot = len(journal)
+        failed = array(ID_TYPECODE)
+
+        for start in range(0, snapshot, DELETE_CHUNK):
+            chunk = journal[start:start + DELETE_CHUNK]
+            if not await self._delete_chunk(bot, room_id, chunk):
+                failed.extend(chunk)
+
+        self._journals[room_id] = failed + journal[snapshot:]
+        self._rewrite(room_id)
+
+        deleted = snapshot - len(failed)
+        logger.info(f"Purged {deleted} message(s) from room {room_id} "
+                    f"in {-(-snapshot // DELETE_CHUNK)} call(s)")
+        return deleted
+
+    async def _delete_chunk(self, bot, room_id, chunk):
+        """Returns False if the chunk should stay journaled for another try"""
+        for _ in range(MAX_FLOOD_WAITS):
+            try:
+                # IDs that are already gone are skipped by Telegram
+                await bot.delete_messages(room_id, chunk.tolist())
+                return True
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after
+                logger.warning(f"Flood control purging room {room_id}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+            except (BadRequest, Forbidden) as e:
+                # e.g. all too old to delete; retrying won't change the answer
+                logger.warning(f"Telegram refused to delete {len(chunk)} message(s) in room {room_id}: {e}")
+                return True
+            except TelegramError as e:
+                logger.error(f"Could not delete {len(chunk)} message(s) in room {room_id}: {e}")
+                return False
+        return False
+
+
+# Global message journal instance
+message_journal = MessageJournal()
@@ -0,0 +1,168 @@
+"""
+Monitor Store - Durable state for the blockchain monitor
+
+Keeps the scan checkpoint, processed transaction hashes and active deals in
+a local SQLite database (WAL mode), so a restart resumes from the exact last
+scanned block instead of rescanning.
+"""
+import json
+import logging
+import sqlite3
+
+from config import MONITOR_DB_PATH
+from tx_dedup import tx_hash_key
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    name TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed_txs (
+    tx_hash BLOB PRIMARY KEY,
+    block_number INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS processed_txs_block ON processed_txs (block_number);
+CREATE TABLE IF NOT EXISTS pending_deposits (
+    tx_hash BLOB PRIMARY KEY,
+    block_number INTEGER NOT NULL,
+    deal_id TEXT NOT NULL,
+    token TEXT NOT NULL,
+    from_address TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deals (
+    deal_id TEXT PRIMARY KEY,
+    info TEXT NOT NULL
+);
+"""
+
+
+class MonitorStore:
+    def __init__(self, path=MONITOR_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        logger.info(f"Monitor store opened: {path}")
+
+    def close(self):
+        self.conn.close()
+
+    # ---- checkpoint ----
+
+    def get_checkpoint(self, name="scan"):
+        row = self.conn.execute(
+            "SELECT block_number FROM checkpoint WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    # ---- processed transactions ----
+
+    def load_processed_txs(self):
+        """Return (tx_hash bytes, block_number) pairs"""
+        return self.conn.execute(
+            "SELECT tx_hash, block_number FROM processed_txs"
+        ).fetchall()
+
+    def commit_scan(self, checkpoint, processed_txs=(), pending_added=(),
+                    pending_removed=(), name="scan"):
+        """
+        Record processed transactions, pending deposit changes and the
+        checkpoint atomically
+
+        Args:
+            checkpoint: Last fully scanned block, or None to leave it unchanged
+            processed_txs: Iterable of (tx_hash bytes, block_number)
+            pending_added: Deposits (deal_id, token, tx_hash, from_address,
+                value, block_number) that entered the confirmation queue
+            pending_removed: Tx hashes that left the confirmation queue
+        """
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed_txs (tx_hash, block_number) VALUES (?, ?)",
+                processed_txs
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pending_deposits "
+                "(tx_hash, block_number, deal_id, token, from_address, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (tx_hash_key(d.tx_hash), d.block_number, json.dumps(d.deal_id),
+                     d.token, d.from_address, str(d.value))
+                    for d in pending_added
+                ]
+            )
+            self.conn.executemany(
+                "DELETE FROM pending_deposits WHERE tx_hash = ?",
+                [(tx_hash_key(tx_hash),) for tx_hash in pending_removed]
+            )
+            if checkpoint is not None:
+                self.conn.execute(
+                    "INSERT INTO checkpoint (name, block_number) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET block_number = excluded.block_number",
+                    (name, checkpoint)
+                )
+
+    def prune_processed_txs(self, before_block):
+        """Forget processed txs from blocks that can no longer be rescanned"""
+        self.conn.execute(
+            "DELETE FROM processed_txs WHERE block_number < ?", (before_block,)
+        )
+
+    def rewind(self, fork_block, checkpoint, name="scan"):
+        """Forget processed and pending txs from orphaned blocks and reset the checkpoint"""
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "DELETE FROM processed_txs WHERE block_number >= ?", (fork_block,)
+            )
+            self.conn.execute(
+                "DELETE FROM pending_deposits WHERE block_number >= ?", (fork_block,)
+            )
+            if checkpoint is not None:
+                self.conn.execute(
+                    "UPDATE checkpoint SET block_number = ? WHERE name = ?",
+                    (checkpoint, name)
+                )
+
+    # ---- pending deposits ----
+
+    def load_pending(self):
+        """Return pending deposits as dicts with the fields they were saved with"""
+        rows = self.conn.execute(
+            "SELECT deal_id, token, tx_hash, from_address, value, block_number "
+            "FROM pending_deposits"
+        )
+        return [
+            {
+                "deal_id": json.loads(deal_id),
+                "token": token,
+                "tx_hash": "0x" + tx_hash.hex(),
+                "from_address": from_address,
+                "value": int(value),
+                "block_number": block_number
+            }
+            for deal_id, token, tx_hash, from_address, value, block_number in rows
+        ]
+
+    # ---- deals ----
+
+    def load_deals(self):
+        deals = {}
+        for deal_id, info in self.conn.execute("SELECT deal_id, info FROM deals"):
+            deals[json.loads(deal_id)] = json.loads(info)
+        return deals
+
+    def save_deal(self, deal_id, deal_info):
+        self.conn.execute(
+            "INSERT INTO deals (deal_id, info) VALUES (?, ?) "
+            "ON CONFLICT(deal_id) DO UPDATE SET info = excluded.info",
+            (json.dumps(deal_id), json.dumps(deal_info, default=str))
+        )
+
+    def delete_deal(self, deal_id):
+        self.conn.execute("DELETE FROM deals WHERE deal_id = ?", (json.dumps(deal_id),))
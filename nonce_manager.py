@@ -0,0 +1,83 @@
+"""
+Nonce Manager - Hand out admin wallet nonces locally
+
+Syncs with the chain once, then allocates nonces atomically across asyncio
+tasks, so several payouts can enter the mempool back to back without a
+get_transaction_count call each. It resyncs after a "nonce too low" style
+rejection, after a transaction is dropped or fails to broadcast, and after
+an idle period.
+"""
+import asyncio
+import logging
+import time
+
+from config import NONCE_IDLE_RESYNC_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Node error fragments meaning our local nonce view is out of date
+NONCE_ERROR_MARKERS = (
+    "nonce too low",
+    "nonce too high",
+    "replacement transaction underpriced",
+    "invalid nonce",
+)
+
+# The exact signed transaction is already in the node's pool; it was sent
+ALREADY_KNOWN_MARKERS = (
+    "already known",
+    "known transaction",
+)
+
+
+def is_nonce_error(error):
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+
+def is_already_known(error):
+    message = str(error).lower()
+    return any(marker in message for marker in ALREADY_KNOWN_MARKERS)
+
+
+class NonceManager:
+    def __init__(self, fetch_nonce, idle_resync_seconds=NONCE_IDLE_RESYNC_SECONDS):
+        """
+        Args:
+            fetch_nonce: Coroutine function returning the wallet's pending transaction count
+        """
+        self.fetch_nonce = fetch_nonce
+        self.idle_resync_seconds = idle_resync_seconds
+        self._lock = asyncio.Lock()
+        self._next_nonce = None
+        self._last_used = 0.0
+        # Nonces below this are spoken for even if the chain doesn't count them yet
+        self._floor = 0
+
+    async def allocate(self):
+        """Reserve the next nonce"""
+        return (await self.allocate_many(1))[0]
+
+    async def allocate_many(self, count):
+        """Reserve `count` consecutive nonces"""
+        async with self._lock:
+            idle = time.monotonic() - self._last_used > self.idle_resync_seconds
+            if self._next_nonce is None or idle:
+                # The chain may have moved (dropped txs, payouts sent elsewhere)
+                self._next_nonce = max(await self.fetch_nonce(), self._floor)
+                logger.info(f"Nonce synced from chain: {self._next_nonce}")
+
+            nonces = list(range(self._next_nonce, self._next_nonce + count))
+            self._next_nonce += count
+            self._last_used = time.monotonic()
+            return nonces
+
+    def raise_floor(self, nonce):
+        """Never hand out nonces below `nonce`, even after a resync"""
+        self._floor = max(self._floor, nonce)
+        if self._next_nonce is not None:
+            self._next_nonce = max(self._next_nonce, nonce)
+
+    def invalidate(self):
+        """Force a chain resync on the next allocation"""
+        self._next_nonce = None
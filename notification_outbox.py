@@ -0,0 +1,231 @@
+"""
+Notification Outbox - Rate-limited, non-blocking Telegram delivery
+
+Callers post a message and carry on; one worker task per chat sends it later
+while respecting Telegram's limits (about 30 messages/s overall, 20/min per
+group, 1/s per private chat) with token buckets. A 429 answer pauses the chat
+for the retry_after Telegram asks for. Messages that pile up for a chat while
+it waits are sent together as one message, so a burst of deposits costs one
+API call instead of one each.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+from telegram import Bot
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from config import (
+    BOT_TOKEN,
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_GROUP_RATE,
+    TELEGRAM_CHAT_RATE,
+    OUTBOX_COALESCE_WINDOW
+)
+from message_journal import message_journal
+
+logger = logging.getLogger(__name__)
+
+# Attempts per message on network errors (429s don't count)
+MAX_SEND_ATTEMPTS = 5
+COALESCE_SEPARATOR = "\n\n"
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Take one token, returning how many seconds to wait before using it"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class OutboxMessage:
+    __slots__ = ("text", "options", "coalesce", "future")
+
+    def __init__(self, text, options, coalesce, future):
+        self.text = text
+        self.options = options
+        self.coalesce = coalesce
+        self.future = future
+
+
+class NotificationOutbox:
+    def __init__(self, bot=None, global_rate=TELEGRAM_GLOBAL_RATE, group_rate=TELEGRAM_GROUP_RATE,
+                 chat_rate=TELEGRAM_CHAT_RATE, coalesce_window=OUTBOX_COALESCE_WINDOW):
+        self._bot = bot
+        self.group_rate = group_rate
+        self.chat_rate = chat_rate
+        self.coalesce_window = coalesce_window
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = {}
+        self._queues = {}
+        self._workers = {}
+        # Loop the workers and futures belong to
+        self._loop = None
+
+    @property
+    def bot(self):
+        if self._bot is None:
+            self._bot = Bot(token=BOT_TOKEN)
+        return self._bot
+
+    def bind(self, bot):
+        """Send through the application's Bot instead of a standalone one"""
+        self._bot = bot
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def post(self, chat_id, text, coalesce=True, **options):
+        """
+        Queue a message; never waits on Telegram
+
+        Args:
+            chat_id: Destination chat
+            text: Message text
+            coalesce: Whether it may be merged with other queued messages
+                for the chat (with the same options)
+            **options: Extra send_message arguments (parse_mode, ...)
+
+        Returns:
+            asyncio.Future: Resolves to the sent Message, or fails with the
+            final error. Nobody has to await it.
+        """
+        self._check_loop()
+        future = self._new_future()
+
+        self._queues.setdefault(chat_id, deque()).append(
+            OutboxMessage(text, options, coalesce, future)
+        )
+        worker = self._workers.get(chat_id)
+        if worker is None or worker.done():
+            self._workers[chat_id] = asyncio.create_task(self._run_chat(chat_id))
+        return future
+
+    async def drain(self, timeout=10):
+        """Wait (up to timeout seconds) for everything queued to be sent"""
+        self._check_loop()
+        workers = [w for w in self._workers.values() if not w.done()]
+        if workers:
+            await asyncio.wait(workers, timeout=timeout)
+
+    def _new_future(self):
+        future = asyncio.get_running_loop().create_future()
+        # Unawaited failures are logged by the worker already
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    def _check_loop(self):
+        """Restart workers on the running loop if the bot restarted on a new one"""
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        # Workers from a closed loop never finish; messages they left
+        # queued get new futures and workers here
+        if self._queues:
+            logger.warning(f"Event loop changed; resuming queued notifications for {len(self._queues)} chat(s)")
+        self._loop = loop
+        self._workers = {}
+        for chat_id, queue in self._queues.items():
+            for message in queue:
+                message.future = self._new_future()
+            self._workers[chat_id] = asyncio.create_task(self._run_chat(chat_id))
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Group and channel ids are negative
+            if isinstance(chat_id, int) and chat_id < 0:
+                bucket = TokenBucket(self.group_rate / 60, 1)
+            else:
+                bucket = TokenBucket(self.chat_rate, 1)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _take_batch(self, queue):
+        """Pop the next message, merged with compatible ones queued after it"""
+        first = queue.popleft()
+        batch = [first]
+        if not first.coalesce:
+            return batch
+
+        length = len(first.text)
+        while queue:
+            candidate = queue[0]
+            if not candidate.coalesce or candidate.options != first.options:
+                break
+            length += len(COALESCE_SEPARATOR) + len(candidate.text)
+            if length > MessageLimit.MAX_TEXT_LENGTH:
+                break
+            batch.append(queue.popleft())
+        return batch
+
+    async def _run_chat(self, chat_id):
+        queue = self._queues[chat_id]
+        # Let a burst gather before the first send
+        await asyncio.sleep(self.coalesce_window)
+
+        while queue:
+            await asyncio.sleep(self._chat_bucket(chat_id).reserve())
+            await asyncio.sleep(self.global_bucket.reserve())
+
+            batch = self._take_batch(queue)
+            text = COALESCE_SEPARATOR.join(message.text for message in batch)
+            try:
+                sent = await self._send(chat_id, text, batch[0].options)
+            except Exception as e:
+                logger.error(f"Dropping {len(batch)} notification(s) for chat {chat_id}: {e}")
+                for message in batch:
+                    if not message.future.done():
+                        message.future.set_exception(e)
+                continue
+
+            # Our own messages in deal rooms get purged with the rest
+            message_journal.record(chat_id, sent.message_id)
+
+            if len(batch) > 1:
+                logger.info(f"Coalesced {len(batch)} notifications for chat {chat_id}")
+            for message in batch:
+                if not message.future.done():
+                    message.future.set_result(sent)
+
+        del self._queues[chat_id]
+
+    async def _send(self, chat_id, text, options):
+        attempt = 0
+        while True:
+            try:
+                return await self.bot.send_message(chat_id=chat_id, text=text, **options)
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after
+                logger.warning(f"Flood control for chat {chat_id}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+            except (BadRequest, Forbidden):
+                # Retrying won't change the answer
+                raise
+            except TelegramError as e:
+                attempt += 1
+                if attempt >= MAX_SEND_ATTEMPTS:
+                    raise
+                logger.warning(f"Telegram send to {chat_id} failed ({e}), attempt {attempt}")
+                await asyncio.sleep(2 ** attempt)
+
+
+# Global notification outbox instance
+outbox = NotificationOutbox()
@@ -0,0 +1,71 @@
+"""
+Pending Deposits - Matched transfers waiting for enough confirmations
+
+Entries are ordered by the block at which they become confirmed, so each new
+head only pops the deposits that just reached CONFIRMATION_BLOCKS instead of
+rescanning logs. Every deposit is confirmed exactly once.
+"""
+import heapq
+import itertools
+
+from config import CONFIRMATION_BLOCKS
+
+
+class PendingDeposits:
+    def __init__(self, confirmation_blocks=CONFIRMATION_BLOCKS):
+        self.confirmation_blocks = confirmation_blocks
+        # (confirm_at_block, sequence, tx_hash); stale tuples are skipped on pop
+        self._heap = []
+        # tx_hash -> deposit (any object with tx_hash, deal_id and block_number)
+        self._entries = {}
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, tx_hash):
+        return tx_hash in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries.values()))
+
+    def confirm_at(self, deposit):
+        return deposit.block_number + self.confirmation_blocks
+
+    def add(self, deposit):
+        """Queue a deposit. Returns False if it is already pending."""
+        if deposit.tx_hash in self._entries:
+            return False
+        self._entries[deposit.tx_hash] = deposit
+        heapq.heappush(
+            self._heap, (self.confirm_at(deposit), next(self._sequence), deposit.tx_hash)
+        )
+        return True
+
+    def pop_ready(self, head):
+        """Remove and return every deposit confirmed at block `head`"""
+        ready = []
+        while self._heap and self._heap[0][0] <= head:
+            _, _, tx_hash = heapq.heappop(self._heap)
+            deposit = self._entries.pop(tx_hash, None)
+            if deposit is not None:
+                ready.append(deposit)
+        return ready
+
+    def discard(self, tx_hash):
+        # The heap tuple is left behind and skipped when it surfaces
+        return self._entries.pop(tx_hash, None)
+
+    def discard_from_block(self, block_number):
+        """Drop deposits mined at or above a block (e.g. orphaned by a reorg)"""
+        removed = [d for d in self._entries.values() if d.block_number >= block_number]
+        for deposit in removed:
+            del self._entries[deposit.tx_hash]
+        return removed
+
+    def discard_deal(self, deal_id):
+        """Drop every pending deposit for a deal. Returns the removed deposits."""
+        removed = [d for d in self._entries.values() if d.deal_id == deal_id]
+        for deposit in removed:
+            del self._entries[deposit.tx_hash]
+        return removed
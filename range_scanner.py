@@ -0,0 +1,138 @@
+"""
+Adaptive Range Scanner - Fetch logs over large block gaps in chunks
+
+Public BSC RPCs reject eth_getLogs ranges above a few thousand blocks, so a
+gap is split into chunks that grow while responses are fast and shrink on
+slow responses or "too many results" errors. Chunks are fetched concurrently
+up to a limit; the caller may only advance its checkpoint over the
+contiguous run of completed chunks starting at the beginning of the gap.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+from config import (
+    SCAN_CHUNK_SIZE,
+    SCAN_MAX_CHUNK_SIZE,
+    SCAN_MAX_CONCURRENCY,
+    SCAN_TARGET_SECONDS,
+    SCAN_CHUNK_TIMEOUT
+)
+from rpc_pool import RATE_LIMIT_MARKERS
+
+logger = logging.getLogger(__name__)
+
+# Substrings RPC providers use when a log query covers too much: result-size
+# and block-range wording only. Throttling (which can share code -32005)
+# fails the chunk instead, so it is retried next poll rather than split.
+RANGE_ERROR_MARKERS = (
+    "query returned more than",
+    "too many results",
+    "response size",
+    "logs matched by query exceeds",
+    "block range",
+    "range too large",
+    "range is too large",
+)
+
+
+def is_range_error(error):
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    message = str(error).lower()
+    if any(marker in message for marker in RATE_LIMIT_MARKERS):
+        return False
+    return any(marker in message for marker in RANGE_ERROR_MARKERS)
+
+
+class AdaptiveRangeScanner:
+    def __init__(self, fetch, chunk_size=SCAN_CHUNK_SIZE, max_chunk_size=SCAN_MAX_CHUNK_SIZE,
+                 max_concurrency=SCAN_MAX_CONCURRENCY, target_seconds=SCAN_TARGET_SECONDS,
+                 timeout=SCAN_CHUNK_TIMEOUT):
+        """
+        Args:
+            fetch: Coroutine function fetch(from_block, to_block) -> list of logs
+        """
+        self.fetch = fetch
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.max_concurrency = max_concurrency
+        self.target_seconds = target_seconds
+        self.timeout = timeout
+
+    def _grow(self):
+        self.chunk_size = min(self.max_chunk_size, int(self.chunk_size * 1.5) + 1)
+
+    def _shrink(self):
+        self.chunk_size = max(1, self.chunk_size // 2)
+
+    async def scan(self, from_block, to_block):
+        """
+        Fetch logs for from_block..to_block
+
+        Returns:
+            tuple: (logs from the contiguous completed prefix,
+                    last block of that prefix, or from_block - 1 if none)
+        """
+        completed = {}  # chunk start -> (chunk end, logs)
+        retry = deque()  # split chunks waiting to be fetched again
+        state = {"next_start": from_block, "failed": False}
+
+        def next_chunk():
+            if retry:
+                return retry.popleft()
+            if state["failed"] or state["next_start"] > to_block:
+                return None
+            start = state["next_start"]
+            end = min(start + self.chunk_size - 1, to_block)
+            state["next_start"] = end + 1
+            return start, end
+
+        async def worker():
+            while True:
+                chunk = next_chunk()
+                if chunk is None:
+                    return
+                start, end = chunk
+
+                started = time.monotonic()
+                try:
+                    logs = await asyncio.wait_for(self.fetch(start, end), self.timeout)
+                except Exception as e:
+                    if is_range_error(e) and end > start:
+                        self._shrink()
+                        middle = (start + end) // 2
+                        retry.extend([(start, middle), (middle + 1, end)])
+                        logger.info(
+                            f"Log range {start}-{end} too large, chunk size now {self.chunk_size}"
+                        )
+                    else:
+                        # Nothing past a hole can be checkpointed, so stop handing out work
+                        state["failed"] = True
+                        logger.error(f"Error fetching logs {start}-{end}: {e}")
+                    continue
+
+                elapsed = time.monotonic() - started
+                if elapsed > self.target_seconds:
+                    self._shrink()
+                elif elapsed < self.target_seconds / 2:
+                    self._grow()
+
+                completed[start] = (end, logs)
+
+        # Workers stop when the queue is momentarily empty, so run rounds until
+        # splits queued by the last in-flight chunks are drained too
+        while True:
+            await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+            if not retry:
+                break
+
+        logs = []
+        cursor = from_block
+        while cursor in completed:
+            end, chunk_logs = completed[cursor]
+            logs.extend(chunk_logs)
+            cursor = end + 1
+
+        return logs, cursor - 1
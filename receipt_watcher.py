@@ -0,0 +1,79 @@
+"""
+Receipt Watcher - Track in-flight payouts in the background
+
+A single task polls the receipts of every in-flight transaction together
+(one JSON-RPC batch per round) and resolves a future per transaction, so
+submitting a payout never waits for it to be mined.
+"""
+import asyncio
+import logging
+import time
+
+from config import RECEIPT_POLL_INTERVAL, RECEIPT_TIMEOUT
+from rpc_batch import RpcBatchError
+from rpc_client import rpc_client
+
+logger = logging.getLogger(__name__)
+
+
+class ReceiptTimeout(Exception):
+    """No receipt appeared before the deadline (the tx may have been dropped)"""
+
+
+class ReceiptWatcher:
+    def __init__(self, batcher=None, poll_interval=RECEIPT_POLL_INTERVAL, timeout=RECEIPT_TIMEOUT):
+        self.batcher = batcher or rpc_client
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        # tx hash -> (future, deadline)
+        self._inflight = {}
+        self._task = None
+
+    def __len__(self):
+        return len(self._inflight)
+
+    def watch(self, tx_hash):
+        """
+        Start tracking a transaction
+
+        Returns:
+            asyncio.Future: Resolves to the raw receipt dict, or fails with
+            ReceiptTimeout
+        """
+        entry = self._inflight.get(tx_hash)
+        if entry is not None:
+            return entry[0]
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[tx_hash] = (future, time.monotonic() + self.timeout)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return future
+
+    async def _run(self):
+        while self._inflight:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._poll_once()
+            except Exception as e:
+                logger.error(f"Receipt polling failed: {e}")
+
+    async def _poll_once(self):
+        tx_hashes = list(self._inflight)
+        receipts = await self.batcher.call_many([
+            ("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes
+        ])
+
+        now = time.monotonic()
+        for tx_hash, receipt in zip(tx_hashes, receipts):
+            future, deadline = self._inflight[tx_hash]
+
+            if future.cancelled():
+                del self._inflight[tx_hash]
+            elif receipt is not None and not isinstance(receipt, RpcBatchError):
+                del self._inflight[tx_hash]
+                future.set_result(receipt)
+            elif now > deadline:
+                del self._inflight[tx_hash]
+                future.set_exception(ReceiptTimeout(f"No receipt for {tx_hash} after {self.timeout}s"))
@@ -6,6 +6,9 @@ import asyncio
 from telegram import Bot
 from telegram.constants import ParseMode
 from config import MAIN_GROUP_ID, ESCROW_MANAGER
+from message_journal import message_journal
+from notification_outbox import outbox
+from room_pool import room_pool
 
 logger = logging.getLogger(__name__)
 
@@ -13,8 +16,24 @@ logger = logging.getLogger(__name__)
 class RoomManager:
     def __init__(self, bot: Bot):
         self.bot = bot
+        # Messages go through the shared rate-limited outbox
+        self.outbox = outbox
+        self.rooms = room_pool
+        self.journal = message_journal
         logger.info("Room manager initialized")
     
+    def assign_room(self, deal_id):
+        """
+        Lease a free deal room to a new deal
+
+        Args:
+            deal_id: The deal's trade ID
+
+        Returns:
+            The room's chat ID, or None if every room is busy
+        """
+        return self.rooms.acquire(deal_id)
+    
     async def cleanup_room(self, room_id):
         """
         Delete all messages in the deal room after completion
@@ -25,11 +44,9 @@ class RoomManager:
         try:
             logger.info(f"Starting cleanup for room {room_id}")
             
-            # Get chat info
-            chat = await self.bot.get_chat(room_id)
+            # Bulk-delete everything journaled for the room (100 per call)
+            await self.journal.purge(self.bot, room_id)
             
-            # Note: Telegram doesn't allow bulk message deletion
-            # We'll send a cleanup notification instead
             cleanup_message = """
 🧹 *Deal Completed - Room Cleanup*
 
@@ -40,13 +57,13 @@ All deal information has been recorded.
 Thank you for using our secure escrow service! 🎉
             """
             
-            await self.bot.send_message(
-                chat_id=room_id,
-                text=cleanup_message,
+            self.outbox.post(
+                room_id,
+                cleanup_message,
                 parse_mode=ParseMode.MARKDOWN
             )
             
-            logger.info(f"Cleanup notification sent to room {room_id}")
+            logger.info(f"Cleanup notification queued for room {room_id}")
             return True
             
         except Exception as e:
@@ -72,10 +89,11 @@ Thank you for using our secure escrow service! 🎉
 🛡️ *Escrow managed by:* {ESCROW_MANAGER}
             """
             
-            # Send message to main group
-            message = await self.bot.send_message(
-                chat_id=MAIN_GROUP_ID,
-                text=completion_message,
+            # Send message to main group (kept separate so it can be pinned)
+            message = await self.outbox.post(
+                MAIN_GROUP_ID,
+                completion_message,
+                coalesce=False,
                 parse_mode=ParseMode.MARKDOWN
             )
             
@@ -115,6 +133,9 @@ Thank you for using our secure escrow service! 🎉
             # Cleanup room
             await self.cleanup_room(room_id)
             
+            # Room is free for the next deal
+            self.rooms.release(room_id)
+            
             logger.info(f"Deal {deal_info['trade_id']} completed successfully")
             return True
             
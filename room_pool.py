@@ -0,0 +1,168 @@
+"""
+Room Pool - Hand out deal rooms from ROOM_POOL without searching
+
+Free rooms sit in a deque (oldest-released first, so a room that was just
+cleaned rests the longest), busy rooms in a dict of leases keyed by room,
+plus a deal -> room index. Acquire and release are O(1); leases carry the
+deal ID and an expiry so a room whose deal was never completed comes back
+on its own. The state is written to a JSON file on every change so it
+survives restarts.
+"""
+import heapq
+import json
+import logging
+import os
+import time
+from collections import deque, namedtuple
+
+from config import ROOM_POOL, ROOM_POOL_STATE_FILE, ROOM_LEASE_HOURS
+
+logger = logging.getLogger(__name__)
+
+# expires_at is a unix timestamp so it stays meaningful across restarts
+RoomLease = namedtuple("RoomLease", ["room_id", "deal_id", "leased_at", "expires_at"])
+
+
+class RoomPool:
+    def __init__(self, rooms=ROOM_POOL, path=ROOM_POOL_STATE_FILE, lease_hours=ROOM_LEASE_HOURS):
+        self.path = path
+        self.lease_seconds = lease_hours * 3600
+        self.free = deque()
+        # room_id -> RoomLease
+        self.leases = {}
+        # deal_id -> room_id
+        self.room_by_deal = {}
+        # (expires_at, room_id); stale entries are skipped when they surface
+        self._expiries = []
+
+        self._load(rooms)
+
+    def __len__(self):
+        return len(self.free) + len(self.leases)
+
+    def _load(self, rooms):
+        configured = list(dict.fromkeys(rooms))
+        state = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable room pool state {self.path}: {e}")
+
+        # Rooms removed from ROOM_POOL are dropped; new ones start free
+        for lease in state.get("leases", []):
+            lease = RoomLease(**lease)
+            if lease.room_id in configured and lease.room_id not in self.leases:
+                self._add_lease(lease)
+        saved_free = [room_id for room_id in state.get("free", []) if room_id in configured]
+        for room_id in saved_free + configured:
+            if room_id not in self.leases and room_id not in self.free:
+                self.free.append(room_id)
+
+        logger.info(f"Room pool: {len(self.free)} free, {len(self.leases)} leased")
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "free": list(self.free),
+                    "leases": [lease._asdict() for lease in self.leases.values()]
+                }, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist room pool: {e}")
+
+    def _add_lease(self, lease):
+        self.leases[lease.room_id] = lease
+        self.room_by_deal[lease.deal_id] = lease.room_id
+        heapq.heappush(self._expiries, (lease.expires_at, lease.room_id))
+
+    def _expire(self, now):
+        """Return rooms whose lease ran out to the free list"""
+        expired = False
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, room_id = heapq.heappop(self._expiries)
+            lease = self.leases.get(room_id)
+            if lease is None or lease.expires_at != expires_at:
+                continue
+            logger.warning(f"Lease on room {room_id} for deal {lease.deal_id} expired")
+            self._drop_lease(room_id)
+            self.free.append(room_id)
+            expired = True
+        return expired
+
+    def _drop_lease(self, room_id):
+        lease = self.leases.pop(room_id)
+        if self.room_by_deal.get(lease.deal_id) == room_id:
+            del self.room_by_deal[lease.deal_id]
+        return lease
+
+    def acquire(self, deal_id, lease_hours=None):
+        """
+        Lease a free room to a deal
+
+        Args:
+            deal_id: Deal that will use the room
+            lease_hours: Lease length (default ROOM_LEASE_HOURS)
+
+        Returns:
+            The room's chat ID (the same room if the deal already holds one),
+            or None if every room is busy
+        """
+        now = time.time()
+        changed = self._expire(now)
+
+        room_id = self.room_by_deal.get(deal_id)
+        if room_id is None and self.free:
+            room_id = self.free.popleft()
+            seconds = self.lease_seconds if lease_hours is None else lease_hours * 3600
+            self._add_lease(RoomLease(room_id, deal_id, now, now + seconds))
+            logger.info(f"Room {room_id} leased to deal {deal_id}")
+            changed = True
+        elif room_id is None:
+            logger.warning(f"No free room for deal {deal_id} ({len(self.leases)} busy)")
+
+        if changed:
+            self._save()
+        return room_id
+
+    def renew(self, deal_id, lease_hours=None):
+        """Push a deal's lease expiry out again. Returns False if it holds no room."""
+        room_id = self.room_by_deal.get(deal_id)
+        if room_id is None:
+            return False
+        now = time.time()
+        seconds = self.lease_seconds if lease_hours is None else lease_hours * 3600
+        self._add_lease(self.leases[room_id]._replace(expires_at=now + seconds))
+        self._save()
+        return True
+
+    def release(self, room_id):
+        """Return a room to the pool. Returns the lease it held, or None."""
+        if room_id not in self.leases:
+            return None
+        lease = self._drop_lease(room_id)
+        self.free.append(room_id)
+        self._save()
+        logger.info(f"Room {room_id} released by deal {lease.deal_id}")
+        return lease
+
+    def release_deal(self, deal_id):
+        """Return whatever room a deal holds. Returns the lease, or None."""
+        room_id = self.room_by_deal.get(deal_id)
+        return None if room_id is None else self.release(room_id)
+
+    def room_for_deal(self, deal_id):
+        return self.room_by_deal.get(deal_id)
+
+    def deal_in_room(self, room_id):
+        lease = self.leases.get(room_id)
+        return None if lease is None else lease.deal_id
+
+
+# Global room pool instance
+room_pool = RoomPool()
@@ -0,0 +1,101 @@
+"""
+JSON-RPC Batch Client - Send many RPC lookups in one HTTP round trip
+
+web3.py 6.x has no batch request API, so receipts and block headers needed
+for one scan window are posted here as JSON-RPC batch arrays instead.
+"""
+import asyncio
+import itertools
+import logging
+
+import aiohttp
+
+from config import BSC_RPC_URL, RPC_BATCH_SIZE, RPC_MAX_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class RpcBatchError(Exception):
+    """Error for a single item of a batch; the other items are unaffected"""
+
+    def __init__(self, method, params, error):
+        self.method = method
+        self.params = params
+        self.error = error
+        super().__init__(f"{method} failed: {error}")
+
+
+class JsonRpcBatcher:
+    def __init__(self, url=BSC_RPC_URL, batch_size=RPC_BATCH_SIZE,
+                 max_concurrency=RPC_MAX_CONCURRENCY, timeout=30):
+        self.url = url
+        self.batch_size = max(1, batch_size)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._ids = itertools.count(1)
+        self._session = None
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _post_batch(self, payload):
+        session = await self._get_session()
+        async with session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def call_many(self, calls):
+        """
+        Execute RPC calls as batch requests
+
+        Args:
+            calls: List of (method, params) tuples
+
+        Returns:
+            list: One entry per call, in order. Each entry is the raw JSON
+            result or an RpcBatchError for items that failed.
+        """
+        chunks = [
+            calls[i:i + self.batch_size]
+            for i in range(0, len(calls), self.batch_size)
+        ]
+        results = await asyncio.gather(*(self._send_chunk(chunk) for chunk in chunks))
+        return [item for chunk_results in results for item in chunk_results]
+
+    async def _send_chunk(self, chunk):
+        request_ids = [next(self._ids) for _ in chunk]
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params) in zip(request_ids, chunk)
+        ]
+
+        try:
+            async with self.semaphore:
+                body = await self._post_batch(payload)
+        except Exception as e:
+            logger.error(f"Batch of {len(chunk)} RPC calls failed: {e}")
+            return [RpcBatchError(method, params, e) for method, params in chunk]
+
+        if not isinstance(body, list):
+            # Some endpoints answer a rejected batch with a single error object
+            error = body.get("error", body) if isinstance(body, dict) else body
+            return [RpcBatchError(method, params, error) for method, params in chunk]
+
+        responses = {item.get("id"): item for item in body if isinstance(item, dict)}
+
+        results = []
+        for request_id, (method, params) in zip(request_ids, chunk):
+            item = responses.get(request_id)
+            if item is None:
+                results.append(RpcBatchError(method, params, "missing from batch response"))
+            elif "error" in item:
+                results.append(RpcBatchError(method, params, item["error"]))
+            else:
+                results.append(item.get("result"))
+        return results
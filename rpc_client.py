@@ -0,0 +1,158 @@
+"""
+RPC Client - One pooled JSON-RPC connection shared by every module
+
+The monitor, the transaction handler, the balance snapshot and the debug
+scripts all talk to BSC through the same keep-alive HTTP session, routed
+across the configured endpoints by the RpcPool. Identical
+idempotent calls made at the same time share one in-flight request, and a
+few methods whose answer changes slowly are cached for a short per-method
+TTL. AsyncWeb3 uses the client through SharedRpcProvider; batch lookups go
+through the inherited call_many.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from web3 import AsyncWeb3
+from web3._utils.encoding import Web3JsonEncoder
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from config import RPC_BATCH_SIZE, RPC_MAX_CONCURRENCY
+from rpc_batch import JsonRpcBatcher
+from rpc_pool import RpcPool
+
+logger = logging.getLogger(__name__)
+
+# Read-only methods: concurrent identical calls share one request, and the
+# pool may hedge or retry them on another endpoint
+SINGLE_FLIGHT_METHODS = frozenset({
+    "web3_clientVersion",
+    "net_version",
+    "eth_chainId",
+    "eth_blockNumber",
+    "eth_gasPrice",
+    "eth_getBalance",
+    "eth_getCode",
+    "eth_getTransactionCount",
+    "eth_call",
+    "eth_estimateGas",
+    "eth_getLogs",
+    "eth_getBlockByNumber",
+    "eth_getBlockByHash",
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+})
+
+# Mempool-dependent methods: pending nonces must come from the node that
+# receives our broadcasts, so these always go to the pool's pinned endpoint
+PINNED_METHODS = frozenset({
+    "eth_getTransactionCount",
+    "eth_sendRawTransaction",
+    "eth_getTransactionByHash",
+})
+
+# Seconds a successful result is reused (None = for the life of the process)
+METHOD_TTLS = {
+    "web3_clientVersion": None,
+    "net_version": None,
+    "eth_chainId": None,
+    "eth_blockNumber": 1.0,  # BSC produces a block every ~3 seconds
+    "eth_gasPrice": 2.0,
+}
+
+
+class RpcClient(JsonRpcBatcher):
+    def __init__(self, pool=None, batch_size=RPC_BATCH_SIZE, max_concurrency=RPC_MAX_CONCURRENCY):
+        super().__init__(None, batch_size, max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.pool = pool or RpcPool()
+        # (method, encoded params) -> in-flight future
+        self._inflight = {}
+        # (method, encoded params) -> (response, expires_at or None)
+        self._cache = {}
+
+    async def close(self):
+        await self.pool.close()
+        # In-flight lookups and the semaphore belong to the loop shutting down
+        self._inflight.clear()
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _post_batch(self, payload):
+        read_only = all(item["method"] in SINGLE_FLIGHT_METHODS for item in payload)
+        pinned = any(item["method"] in PINNED_METHODS for item in payload)
+        return await self.pool.post(json.dumps(payload, separators=(",", ":")), read_only, pinned)
+
+    async def request(self, method, params=None):
+        """
+        Execute one RPC call
+
+        Returns:
+            dict: The response body without jsonrpc/id, i.e. {"result": ...}
+            or {"error": ...}. Errors are never cached.
+        """
+        encoded_params = json.dumps(params or [], cls=Web3JsonEncoder, separators=(",", ":"))
+        # Inside a scan the answer must come from the scan's endpoint, not a
+        # shared or cached one that another endpoint gave
+        if method not in SINGLE_FLIGHT_METHODS or self.pool.scan_endpoint() is not None:
+            return await self._post(method, encoded_params)
+
+        key = (method, encoded_params)
+        cached = self._cache.get(key)
+        if cached is not None:
+            response, expires_at = cached
+            if expires_at is None or time.monotonic() < expires_at:
+                return response
+            del self._cache[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch(key))
+            self._inflight[key] = inflight
+        # A cancelled caller must not cancel the request others are waiting on
+        return await asyncio.shield(inflight)
+
+    async def _fetch(self, key):
+        method, encoded_params = key
+        try:
+            response = await self._post(method, encoded_params)
+        finally:
+            self._inflight.pop(key, None)
+
+        if method in METHOD_TTLS and "error" not in response:
+            ttl = METHOD_TTLS[method]
+            self._cache[key] = (response, None if ttl is None else time.monotonic() + ttl)
+        return response
+
+    async def _post(self, method, encoded_params):
+        request_id = next(self._ids)
+        body = f'{{"jsonrpc":"2.0","id":{request_id},"method":"{method}","params":{encoded_params}}}'
+
+        payload = await self.pool.post(body, method in SINGLE_FLIGHT_METHODS, method in PINNED_METHODS)
+
+        if not isinstance(payload, dict):
+            return {"error": {"code": -32603, "message": f"Malformed response: {payload!r}"}}
+        payload.pop("jsonrpc", None)
+        payload.pop("id", None)
+        return payload
+
+
+class SharedRpcProvider(AsyncJSONBaseProvider):
+    """AsyncWeb3 provider that sends every request through an RpcClient"""
+
+    def __init__(self, client=None):
+        super().__init__()
+        self.client = client or rpc_client
+
+    async def make_request(self, method, params):
+        response = await self.client.request(method, params)
+        return {"jsonrpc": "2.0", "id": next(self.request_counter), **response}
+
+
+def make_web3(client=None):
+    """Build an AsyncWeb3 instance on the shared client"""
+    return AsyncWeb3(SharedRpcProvider(client))
+
+
+# Global RPC client instance
+rpc_client = RpcClient()
@@ -0,0 +1,342 @@
+"""
+RPC Endpoint Pool - Route JSON-RPC requests across several BSC endpoints
+
+Each endpoint keeps a moving average of its latency and error rate. Requests
+go to the healthiest endpoint; a read that is slower than usual is hedged by
+sending the same request to the next endpoint and taking whichever answers
+first, and a read that fails is retried on the next endpoint. Endpoints whose
+error rate climbs too high (or that fail several times in a row) are ejected
+and re-probed in the background until they answer again.
+
+Requests that depend on one node's mempool (pending nonces, broadcasts) are
+pinned to a single endpoint, which only changes when it gets ejected. A block
+scan can likewise hold one endpoint for every read it makes (see scan()), so
+its head, headers and logs all come from the same view of the chain.
+"""
+import asyncio
+import contextlib
+import contextvars
+import logging
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+
+from config import (
+    BSC_RPC_URLS,
+    RPC_POOL_SIZE,
+    RPC_KEEPALIVE_SECONDS,
+    RPC_TIMEOUT,
+    RPC_HEDGE_DELAY,
+    RPC_EJECT_ERROR_RATE,
+    RPC_EJECT_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+# Consecutive failures that eject an endpoint regardless of its average
+MAX_CONSECUTIVE_FAILURES = 3
+# Ejections back off up to this many seconds while probes keep failing
+MAX_EJECT_SECONDS = 600
+# The pinned endpoint is replaced once it scores this much worse than the best
+PIN_SWITCH_FACTOR = 4
+
+# JSON-RPC error message fragments meaning the endpoint throttled us. Error
+# codes are not used: -32005 also means "query returned more than 10000
+# results", which is the caller's problem, not the endpoint's.
+RATE_LIMIT_MARKERS = (
+    "rate limit",
+    "rate-limit",
+    "ratelimit",
+    "too many requests",
+    "request rate exceeded",
+    "requests per second",
+)
+
+
+# Endpoint held by the current scan(); tasks spawned inside inherit it
+_scan_endpoint = contextvars.ContextVar("rpc_scan_endpoint", default=None)
+
+
+class RpcEndpointError(IOError):
+    """The endpoint itself failed (transport error, HTTP error, throttling)"""
+
+
+def is_rate_limited(body):
+    """Whether a JSON-RPC error body is a throttling answer (HTTP 429 is checked separately)"""
+    if not isinstance(body, dict) or not isinstance(body.get("error"), dict):
+        return False
+    error = body["error"]
+    message = str(error.get("message", "")).lower()
+    return error.get("code") == 429 or any(m in message for m in RATE_LIMIT_MARKERS)
+
+
+class Endpoint:
+    def __init__(self, url):
+        self.url = url
+        # Host only: provider URLs often carry an API key in the path
+        self.name = urlparse(url).hostname or url
+        self.latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.ejected_until = 0.0
+        self.eject_seconds = RPC_EJECT_SECONDS
+
+    @property
+    def ejected(self):
+        """Out of rotation until a background probe succeeds"""
+        return self.ejected_until > 0
+
+    def score(self):
+        """Lower is healthier; unmeasured endpoints are tried early"""
+        latency = self.latency if self.latency is not None else 0.0
+        return latency * (1 + 4 * self.error_rate)
+
+    def record_success(self, elapsed):
+        self.requests += 1
+        self.latency = elapsed if self.latency is None else (
+            EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.latency
+        )
+        self.error_rate *= 1 - EWMA_ALPHA
+        self.consecutive_failures = 0
+
+    def record_cancelled(self, elapsed):
+        """A hedge loser: it took at least `elapsed`, so count that as its latency"""
+        self.latency = elapsed if self.latency is None else (
+            EWMA_ALPHA * max(elapsed, self.latency) + (1 - EWMA_ALPHA) * self.latency
+        )
+
+    def record_failure(self):
+        self.requests += 1
+        self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures += 1
+
+
+class RpcPool:
+    def __init__(self, urls=BSC_RPC_URLS, timeout=RPC_TIMEOUT, pool_size=RPC_POOL_SIZE,
+                 keepalive=RPC_KEEPALIVE_SECONDS, hedge_delay=RPC_HEDGE_DELAY,
+                 eject_error_rate=RPC_EJECT_ERROR_RATE):
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.hedge_delay = hedge_delay
+        self.eject_error_rate = eject_error_rate
+        self._session = None
+        self._session_loop = None
+        self._probe_task = None
+        self._pinned = None
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session_loop is not loop:
+            # The bot restarted on a new event loop; the old session and probe
+            # task belong to the closed one and can't be used or closed
+            self._session = None
+            self._session_loop = loop
+            self._probe_task = None
+            if any(e.ejected for e in self.endpoints):
+                self._probe_task = asyncio.ensure_future(self._probe_ejected())
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    # ---- routing ----
+
+    def ranked(self):
+        """Healthy endpoints by score, then ejected ones by when they return"""
+        healthy = sorted((e for e in self.endpoints if not e.ejected), key=Endpoint.score)
+        ejected = sorted((e for e in self.endpoints if e.ejected), key=lambda e: e.ejected_until)
+        return healthy + ejected
+
+    def pinned(self):
+        """The endpoint mempool-dependent requests stick to"""
+        best = self.ranked()[0]
+        if (self._pinned is None or self._pinned.ejected
+                or self._pinned.score() > PIN_SWITCH_FACTOR * best.score() > 0):
+            self._pinned = best
+            logger.info(f"Pinned nonce reads and broadcasts to RPC endpoint {self._pinned.name}")
+        return self._pinned
+
+    @contextlib.contextmanager
+    def scan(self):
+        """
+        Send every non-pinned request made inside the block to one endpoint
+
+        Used for a block scan: a head read from one node and an eth_getLogs
+        answered by a node that lags behind it would look like an empty
+        range, and headers from two nodes on different forks like a reorg.
+        """
+        token = _scan_endpoint.set(self.ranked()[0])
+        try:
+            yield
+        finally:
+            _scan_endpoint.reset(token)
+
+    def scan_endpoint(self):
+        """The endpoint held by the enclosing scan(), or None"""
+        endpoint = _scan_endpoint.get()
+        return endpoint if endpoint in self.endpoints else None
+
+    async def post(self, body, read_only, pinned=False):
+        """
+        Send a JSON-RPC request body
+
+        Args:
+            body: Encoded JSON request (single call or batch)
+            read_only: Whether the request may be hedged and retried on
+                another endpoint; writes go to the best endpoint once
+            pinned: Send it to the pinned endpoint, once (nonce reads and
+                broadcasts must all see the same mempool)
+
+        Returns:
+            The decoded JSON response
+        """
+        if pinned:
+            return await self._attempt(self.pinned(), body)
+
+        # No hedging or failover inside a scan; it is retried next poll
+        scan_endpoint = self.scan_endpoint()
+        if scan_endpoint is not None:
+            return await self._attempt(scan_endpoint, body)
+
+        candidates = self.ranked()
+        if not read_only or len(candidates) == 1:
+            return await self._attempt(candidates[0], body)
+
+        remaining = list(candidates)
+        inflight = {}
+        hedged = False
+        last_error = None
+
+        def launch():
+            endpoint = remaining.pop(0)
+            inflight[asyncio.ensure_future(self._attempt(endpoint, body))] = endpoint
+
+        launch()
+        try:
+            while inflight:
+                timeout = None
+                if remaining and not hedged:
+                    primary = next(iter(inflight.values()))
+                    timeout = max(self.hedge_delay, 2 * (primary.latency or 0))
+
+                done, _ = await asyncio.wait(
+                    inflight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slow read: race it against the next endpoint
+                    hedged = True
+                    launch()
+                    continue
+
+                for task in done:
+                    del inflight[task]
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                # Fail over once nothing else is still in flight
+                if remaining and not inflight:
+                    launch()
+
+            raise last_error
+        finally:
+            for task in inflight:
+                task.cancel()
+
+    async def _attempt(self, endpoint, body):
+        started = time.monotonic()
+        try:
+            session = await self._get_session()
+            async with session.post(
+                endpoint.url, data=body, headers={"Content-Type": "application/json"}
+            ) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise RpcEndpointError(f"{endpoint.name} returned HTTP {response.status}")
+                response.raise_for_status()
+                payload = await response.json(content_type=None)
+            if is_rate_limited(payload):
+                raise RpcEndpointError(f"{endpoint.name} rate limited: {payload['error']}")
+        except asyncio.CancelledError:
+            # Usually a hedge loser; don't let a slow endpoint stay unmeasured
+            endpoint.record_cancelled(time.monotonic() - started)
+            raise
+        except Exception as e:
+            endpoint.record_failure()
+            self._maybe_eject(endpoint)
+            if isinstance(e, RpcEndpointError):
+                raise
+            raise RpcEndpointError(f"{endpoint.name}: {type(e).__name__}: {e}") from e
+
+        endpoint.record_success(time.monotonic() - started)
+        return payload
+
+    # ---- ejection and re-probing ----
+
+    def _maybe_eject(self, endpoint):
+        if endpoint.ejected or len(self.endpoints) == 1:
+            return
+        if (endpoint.error_rate < self.eject_error_rate
+                and endpoint.consecutive_failures < MAX_CONSECUTIVE_FAILURES):
+            return
+
+        endpoint.ejected_until = time.monotonic() + endpoint.eject_seconds
+        logger.warning(
+            f"RPC endpoint {endpoint.name} ejected for {endpoint.eject_seconds}s "
+            f"(error rate {endpoint.error_rate:.0%})"
+        )
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.ensure_future(self._probe_ejected())
+
+    async def _probe_ejected(self):
+        while True:
+            ejected = [e for e in self.endpoints if e.ejected]
+            if not ejected:
+                return
+            await asyncio.sleep(max(0.0, min(e.ejected_until for e in ejected) - time.monotonic()))
+
+            for endpoint in ejected:
+                if endpoint.ejected_until > time.monotonic():
+                    continue
+                try:
+                    await self._attempt(endpoint, b'{"jsonrpc":"2.0","id":0,"method":"eth_blockNumber","params":[]}')
+                except Exception as e:
+                    endpoint.eject_seconds = min(endpoint.eject_seconds * 2, MAX_EJECT_SECONDS)
+                    endpoint.ejected_until = time.monotonic() + endpoint.eject_seconds
+                    logger.warning(f"RPC endpoint {endpoint.name} still failing: {e}")
+                    continue
+
+                endpoint.ejected_until = 0.0
+                endpoint.eject_seconds = RPC_EJECT_SECONDS
+                endpoint.error_rate = 0.0
+                logger.info(f"RPC endpoint {endpoint.name} back in rotation")
+
+    def health(self):
+        """Per-endpoint status for /status"""
+        return [
+            {
+                'name': endpoint.name,
+                'state': 'ejected' if endpoint.ejected else 'healthy',
+                'latency_ms': None if endpoint.latency is None else round(endpoint.latency * 1000),
+                'error_rate': endpoint.error_rate,
+                'requests': endpoint.requests
+            }
+            for endpoint in self.endpoints
+        ]
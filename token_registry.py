@@ -0,0 +1,132 @@
+"""
+Token Registry - Per-token constants built once at startup
+
+Holds each supported token's contract handle, checksummed address, decimals
+and pre-encoded call data, plus the checksummed admin address, so a payout
+only does the work that depends on its amount and recipient.
+"""
+import asyncio
+from decimal import InvalidOperation
+
+from web3 import Web3
+
+from chain_cache import ChainMetadataCache
+from config import ADMIN_WALLET_ADDRESS, TOKEN_CONTRACTS
+from deal_index import to_base_units, from_base_units
+
+# First 4 bytes of keccak of the function signatures
+TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")    # transfer(address,uint256)
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")  # balanceOf(address)
+
+# ERC20 ABI for transfer function and token metadata
+ERC20_ABI = [
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "_to", "type": "address"},
+            {"name": "_value", "type": "uint256"}
+        ],
+        "name": "transfer",
+        "outputs": [{"name": "", "type": "bool"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [{"name": "_owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "balance", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "decimals",
+        "outputs": [{"name": "", "type": "uint8"}],
+        "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [],
+        "name": "symbol",
+        "outputs": [{"name": "", "type": "string"}],
+        "type": "function"
+    }
+]
+
+
+def encode_address(address):
+    """ABI-encode an address as a 32-byte word"""
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+class TokenInfo:
+    __slots__ = ("symbol", "address", "contract", "decimals", "balance_of_data")
+
+    def __init__(self, symbol, address, contract, admin_address):
+        self.symbol = symbol
+        self.address = address
+        self.contract = contract
+        self.decimals = None
+        self.balance_of_data = self.encode_balance_of(admin_address)
+
+    def to_units(self, amount):
+        """Exact base units, the same conversion deposits are matched with"""
+        try:
+            return to_base_units(amount, self.decimals)
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {amount!r}") from None
+
+    def from_units(self, value):
+        return from_base_units(value, self.decimals)
+
+    def encode_balance_of(self, owner):
+        """Call data for balanceOf(owner)"""
+        return "0x" + (BALANCE_OF_SELECTOR + encode_address(owner)).hex()
+
+    def encode_transfer(self, to_address, amount_in_units):
+        """Call data for transfer(to, amount) without going through the ABI codec"""
+        return "0x" + (
+            TRANSFER_SELECTOR
+            + encode_address(to_address)
+            + amount_in_units.to_bytes(32, "big")
+        ).hex()
+
+
+class TokenRegistry:
+    def __init__(self, w3, abi, metadata=None):
+        self.admin_address = Web3.to_checksum_address(ADMIN_WALLET_ADDRESS)
+        self.metadata = metadata or ChainMetadataCache()
+        self.tokens = {}
+        for symbol, address in TOKEN_CONTRACTS.items():
+            checksum_address = Web3.to_checksum_address(address)
+            self.tokens[symbol] = TokenInfo(
+                symbol,
+                checksum_address,
+                w3.eth.contract(address=checksum_address, abi=abi),
+                self.admin_address
+            )
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def load(self):
+        """Read decimals once per token (from the metadata cache when possible)"""
+        if self._loaded:
+            return
+
+        async def passthrough(awaitable):
+            return await awaitable
+
+        async with self._load_lock:
+            if self._loaded:
+                return
+            await self.metadata.load_tokens(
+                [token.contract for token in self.tokens.values()], passthrough
+            )
+            for token in self.tokens.values():
+                token.decimals = self.metadata.decimals(token.address)
+            self._loaded = True
+
+    async def get(self, token_symbol):
+        """Return the TokenInfo for a symbol, or None if it is not supported"""
+        await self.load()
+        return self.tokens.get(token_symbol)
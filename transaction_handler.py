@@ -1,62 +1,70 @@
 """
 Transaction Handler - Send USDT/USDC transactions (release/refund)
 """
+import asyncio
+import inspect
 import logging
 from web3 import Web3
 from eth_account import Account
+from balance_snapshot import balance_snapshot
+from gas_oracle import GasOracle
+from nonce_manager import NonceManager, is_already_known, is_nonce_error
+from receipt_watcher import ReceiptWatcher
+from rpc_batch import RpcBatchError
+from rpc_client import make_web3, rpc_client
 from config import (
     ADMIN_WALLET_ADDRESS,
     ADMIN_WALLET_PRIVATE_KEY,
-    BSC_RPC_URL,
-    TOKEN_CONTRACTS,
-    MAX_GAS_PRICE
+    PAYOUT_BATCH_WINDOW,
+    PAYOUT_BATCH_MAX
 )
 
 logger = logging.getLogger(__name__)
 
-# ERC20 ABI for transfer function
-ERC20_ABI = [
-    {
-        "constant": False,
-        "inputs": [
-            {"name": "_to", "type": "address"},
-            {"name": "_value", "type": "uint256"}
-        ],
-        "name": "transfer",
-        "outputs": [{"name": "", "type": "bool"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [{"name": "_owner", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "balance", "type": "uint256"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [],
-        "name": "decimals",
-        "outputs": [{"name": "", "type": "uint8"}],
-        "type": "function"
-    }
-]
+# Gas limit for a token transfer when it can't be estimated
+TRANSFER_GAS_LIMIT = 100000
+# Gas for a 0-value self-transfer used to fill or void a nonce
+FILLER_GAS_LIMIT = 21000
 
 
 class TransactionHandler:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider(BSC_RPC_URL))
+        self.w3 = make_web3()
         self.account = Account.from_key(ADMIN_WALLET_PRIVATE_KEY)
+        self.chain_id = None
         
-        # Verify connection
-        if not self.w3.is_connected():
-            raise Exception("Failed to connect to BSC network")
+        # Admin balances come from the shared Multicall3 snapshot, which also
+        # holds the token registry (contract handles, checksummed addresses
+        # and decimals resolved once instead of on every payout)
+        self.balances = balance_snapshot
+        self.tokens = balance_snapshot.tokens
+        
+        # Cached gas price and estimated transfer gas limits
+        self.gas = GasOracle(self.w3, TRANSFER_GAS_LIMIT)
+        
+        # Nonces are allocated locally so concurrent payouts don't collide
+        self.nonces = NonceManager(self._fetch_pending_nonce)
+        # (nonce, minimum gas price) that must be overwritten with self-transfers
+        # before anything else is sent: an unfilled gap and the transfers
+        # stuck behind it, which were reported as failed
+        self._voided = []
+        
+        # Raw transactions are broadcast as JSON-RPC batches, and one
+        # background task tracks every in-flight payout
+        self.batcher = rpc_client
+        self.receipts = ReceiptWatcher(self.batcher)
         
         logger.info(f"Transaction handler initialized. Admin wallet: {ADMIN_WALLET_ADDRESS}")
     
+    async def _fetch_pending_nonce(self):
+        return await self.w3.eth.get_transaction_count(self.tokens.admin_address, 'pending')
+    
     async def send_token(self, to_address, amount, token_symbol):
         """
-        Send USDT/USDC to specified address
+        Send USDT/USDC to specified address and wait until it is mined
+        
+        Only the calling task waits; the receipt is tracked by the shared
+        background watcher. Use submit_token to avoid waiting at all.
         
         Args:
             to_address: Recipient address
@@ -66,148 +74,511 @@ class TransactionHandler:
         Returns:
             dict: Transaction result with tx_hash and status
         """
+        submitted = await self.submit_token(to_address, amount, token_symbol)
+        if not submitted['success']:
+            return submitted
+        return await submitted['confirmation']
+    
+    async def submit_token(self, to_address, amount, token_symbol, on_complete=None):
+        """
+        Broadcast a USDT/USDC transfer and return as soon as it is sent
+        
+        Args:
+            to_address: Recipient address
+            amount: Amount to send (in token units, e.g., 100 USDT)
+            token_symbol: 'USDT' or 'USDC'
+            on_complete: Optional callback (plain or async) called with the
+                final result dict once the transaction is mined or times out
+        
+        Returns:
+            dict: On success, tx_hash, bscscan_link and 'confirmation', a
+            future resolving to the final result dict (same shape as
+            send_token's). On failure, 'success': False and 'error'.
+        """
+        payout = {
+            'to_address': to_address,
+            'amount': amount,
+            'token_symbol': token_symbol,
+            'on_complete': on_complete
+        }
+        return (await self.submit_batch([payout]))[0]
+    
+    async def submit_batch(self, payouts):
+        """
+        Validate, sign and broadcast several transfers together
+        
+        Balances, BNB for gas and the gas price are checked once for the
+        whole batch, nonces are consecutive, and all raw transactions go out
+        in a single JSON-RPC batch.
+        
+        Args:
+            payouts: List of dicts with to_address, amount, token_symbol and
+                optional on_complete (see submit_token)
+        
+        Returns:
+            list: One submit_token-style result dict per payout, in order
+        """
+        results = [None] * len(payouts)
+        # index -> [(token symbol or None for BNB, raw amount)] held on the snapshot
+        reservations = {}
+        
+        def fail(index, error):
+            logger.error(f"Error sending transaction: {error}")
+            results[index] = {'success': False, 'error': str(error)}
+            self._release(reservations.pop(index, []))
+        
         try:
-            # Get token contract address
-            token_address = TOKEN_CONTRACTS.get(token_symbol)
-            if not token_address:
-                raise ValueError(f"Unsupported token: {token_symbol}")
+            # Resolve tokens from the registry, checksum recipients and
+            # convert amounts; a bad item fails on its own, not the batch
+            tokens = {}
+            recipients = {}
+            amounts = {}
+            for index, payout in enumerate(payouts):
+                token_symbol = payout['token_symbol']
+                token = await self.tokens.get(token_symbol)
+                if token is None:
+                    fail(index, ValueError(f"Unsupported token: {token_symbol}"))
+                    continue
+                try:
+                    recipient = Web3.to_checksum_address(payout['to_address'])
+                    amount_in_units = token.to_units(payout['amount'])
+                    if not 0 < amount_in_units < 2 ** 256:
+                        raise ValueError(f"Invalid amount: {payout['amount']} {token_symbol}")
+                except Exception as e:
+                    fail(index, e)
+                    continue
+                recipients[index] = recipient
+                amounts[index] = amount_in_units
+                tokens[token_symbol] = token
             
-            # Create contract instance
-            contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=ERC20_ABI
+            # Admin balances (usually from the cached snapshot), recipient
+            # balances and gas price in one round (recipient balances pick
+            # the gas limit class)
+            holdings = list({
+                (payouts[index]['token_symbol'], recipient) for index, recipient in recipients.items()
+            })
+            snapshot, gas_price, recipient_balances = await asyncio.gather(
+                self.balances.get(),
+                self.gas.gas_price(),
+                asyncio.gather(
+                    *(self._balance_of(tokens[symbol], recipient) for symbol, recipient in holdings),
+                    return_exceptions=True
+                )
             )
+            # A failed lookup counts as a new recipient (the larger gas limit)
+            funded = {
+                holding for holding, balance in zip(holdings, recipient_balances)
+                if not isinstance(balance, Exception) and balance > 0
+            }
+            bnb_balance = self.balances.spendable(snapshot)
             
-            # Get token decimals
-            decimals = contract.functions.decimals().call()
-            
-            # Convert amount to token units
-            amount_in_units = int(float(amount) * (10 ** decimals))
+            # Admit payouts in order while the unreserved token balance covers
+            # them; nothing awaits between the check and the reservation
+            admitted = []
+            for index, payout in enumerate(payouts):
+                if results[index] is not None:
+                    continue
+                token_symbol = payout['token_symbol']
+                token = tokens[token_symbol]
+                amount_in_units = amounts[index]
+                
+                available = self.balances.spendable(snapshot, token_symbol)
+                if available is None:
+                    fail(index, ValueError(f"Could not read admin {token_symbol} balance"))
+                    continue
+                if available < amount_in_units:
+                    fail(index, ValueError(
+                        f"Insufficient balance. Required: {payout['amount']} {token_symbol}, "
+                        f"Available: {token.from_units(available)} {token_symbol}"
+                    ))
+                    continue
+                
+                self.balances.reserve(token_symbol, amount_in_units)
+                reservations[index] = [(token_symbol, amount_in_units)]
+                admitted.append((index, token, amount_in_units))
             
-            # Check balance
-            balance = contract.functions.balanceOf(
-                Web3.to_checksum_address(ADMIN_WALLET_ADDRESS)
-            ).call()
+            # Gas limit per transfer, from the oracle's per-class estimates;
+            # a second payout to the same wallet in this batch is not "new"
+            gas_limits = []
+            estimated = []
+            for index, token, amount_in_units in admitted:
+                holding = (token.symbol, recipients[index])
+                recipient_is_new = holding not in funded
+                try:
+                    gas_limits.append(await self.gas.transfer_gas_limit(token, {
+                        'from': self.tokens.admin_address,
+                        'to': token.address,
+                        'data': token.encode_transfer(recipients[index], amount_in_units)
+                    }, recipient_is_new))
+                except Exception as e:
+                    fail(index, e)
+                    continue
+                funded.add(holding)
+                estimated.append((index, token, amount_in_units))
+            admitted = estimated
             
-            if balance < amount_in_units:
-                raise ValueError(
-                    f"Insufficient balance. Required: {amount} {token_symbol}, "
-                    f"Available: {balance / (10 ** decimals)} {token_symbol}"
-                )
-            
-            # Check BNB balance for gas
-            bnb_balance = self.w3.eth.get_balance(ADMIN_WALLET_ADDRESS)
-            if bnb_balance < self.w3.to_wei(0.001, 'ether'):
+            # Check BNB balance for gas across the whole batch
+            gas_needed = max(
+                self.w3.to_wei(0.001, 'ether'),
+                sum(gas_limits) * gas_price
+            )
+            if admitted and bnb_balance < gas_needed:
                 raise ValueError(
                     f"Insufficient BNB for gas. Balance: {self.w3.from_wei(bnb_balance, 'ether')} BNB"
                 )
+            for (index, _, _), gas_limit in zip(admitted, gas_limits):
+                self.balances.reserve(None, gas_limit * gas_price)
+                reservations[index].append((None, gas_limit * gas_price))
             
-            # Build transaction
-            nonce = self.w3.eth.get_transaction_count(ADMIN_WALLET_ADDRESS)
-            
-            # Get current gas price
-            gas_price = self.w3.eth.gas_price
-            max_gas_price_wei = self.w3.to_wei(MAX_GAS_PRICE, 'gwei')
-            
-            if gas_price > max_gas_price_wei:
-                logger.warning(f"Gas price too high: {self.w3.from_wei(gas_price, 'gwei')} gwei")
-                gas_price = max_gas_price_wei
-            
-            # Build transfer transaction
-            transaction = contract.functions.transfer(
-                Web3.to_checksum_address(to_address),
-                amount_in_units
-            ).build_transaction({
-                'from': ADMIN_WALLET_ADDRESS,
-                'nonce': nonce,
-                'gas': 100000,  # Standard gas limit for token transfer
-                'gasPrice': gas_price
-            })
-            
-            # Sign transaction
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=ADMIN_WALLET_PRIVATE_KEY
-            )
-            
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_hash_hex = self.w3.to_hex(tx_hash)
+            if admitted:
+                tx_hashes = await self._broadcast_transfers(
+                    [
+                        (token, recipients[index], units, gas_limit)
+                        for (index, token, units), gas_limit in zip(admitted, gas_limits)
+                    ],
+                    gas_price
+                )
+                # The snapshot no longer matches the chain once anything went out
+                if not all(isinstance(tx_hash, Exception) for tx_hash in tx_hashes):
+                    self.balances.invalidate()
+            else:
+                tx_hashes = []
+        
+        except Exception as e:
+            for index in range(len(payouts)):
+                if results[index] is None:
+                    fail(index, e)
+            return results
+        
+        for (index, _, _), tx_hash in zip(admitted, tx_hashes):
+            payout = payouts[index]
+            if isinstance(tx_hash, Exception):
+                fail(index, tx_hash)
+                continue
             
-            logger.info(f"Transaction sent: {tx_hash_hex}")
+            logger.info(f"Transaction sent: {tx_hash}")
+            confirmation = asyncio.ensure_future(self._await_confirmation(
+                tx_hash, payout['amount'], payout['token_symbol'],
+                payout['to_address'], payout.get('on_complete'), reservations.pop(index)
+            ))
+            results[index] = {
+                'success': True,
+                'tx_hash': tx_hash,
+                'bscscan_link': f"https://bscscan.com/tx/{tx_hash}",
+                'confirmation': confirmation
+            }
+        
+        return results
+    
+    async def _await_confirmation(self, tx_hash_hex, amount, token_symbol, to_address, on_complete,
+                                  reservation=()):
+        """Wait for the watcher to report the receipt and build the final result"""
+        try:
+            receipt = await self.receipts.watch(tx_hash_hex)
+            # Gas was spent either way; re-read balances as of the mined block
+            self.balances.invalidate()
             
-            # Wait for transaction receipt (with timeout)
-            try:
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-                
-                if receipt['status'] == 1:
-                    logger.info(f"Transaction successful: {tx_hash_hex}")
-                    return {
-                        'success': True,
-                        'tx_hash': tx_hash_hex,
-                        'amount': amount,
-                        'token': token_symbol,
-                        'to': to_address,
-                        'gas_used': receipt['gasUsed'],
-                        'bscscan_link': f"https://bscscan.com/tx/{tx_hash_hex}"
-                    }
-                else:
-                    logger.error(f"Transaction failed: {tx_hash_hex}")
-                    return {
-                        'success': False,
-                        'error': 'Transaction reverted',
-                        'tx_hash': tx_hash_hex
-                    }
-                    
-            except Exception as e:
-                logger.error(f"Error waiting for receipt: {e}")
-                return {
-                    'success': False,
-                    'error': f'Transaction sent but receipt timeout: {str(e)}',
+            if int(receipt['status'], 16) == 1:
+                logger.info(f"Transaction successful: {tx_hash_hex}")
+                result = {
+                    'success': True,
                     'tx_hash': tx_hash_hex,
+                    'amount': amount,
+                    'token': token_symbol,
+                    'to': to_address,
+                    'gas_used': int(receipt['gasUsed'], 16),
                     'bscscan_link': f"https://bscscan.com/tx/{tx_hash_hex}"
                 }
-        
+            else:
+                logger.error(f"Transaction failed: {tx_hash_hex}")
+                result = {
+                    'success': False,
+                    'error': 'Transaction reverted',
+                    'tx_hash': tx_hash_hex
+                }
+                
         except Exception as e:
-            logger.error(f"Error sending transaction: {e}")
-            return {
+            logger.error(f"Error waiting for receipt: {e}")
+            # The tx may have been dropped; don't build on a nonce that never landed
+            self.nonces.invalidate()
+            result = {
                 'success': False,
-                'error': str(e)
+                'error': f'Transaction sent but receipt timeout: {str(e)}',
+                'tx_hash': tx_hash_hex,
+                'bscscan_link': f"https://bscscan.com/tx/{tx_hash_hex}"
             }
+        finally:
+            # Mined or given up on: the snapshot now speaks for these funds
+            self._release(reservation)
+        
+        if on_complete is not None:
+            try:
+                callback_result = on_complete(result)
+                if inspect.isawaitable(callback_result):
+                    await callback_result
+            except Exception as e:
+                logger.error(f"Payout callback failed for {tx_hash_hex}: {e}")
+        
+        return result
     
-    def get_token_balance(self, token_symbol):
+    async def _broadcast_transfers(self, transfers, gas_price, retries=1):
+        """
+        Sign transfers with consecutive nonces and send them as one batch
+        
+        Args:
+            transfers: List of (TokenInfo, checksummed to_address, amount_in_units, gas_limit)
+        
+        Returns:
+            list: Tx hash hex string or the exception, per transfer
+        """
+        if self.chain_id is None:
+            self.chain_id = await self.w3.eth.chain_id
+        
+        await self._flush_voided(gas_price)
+        
+        nonces = await self.nonces.allocate_many(len(transfers))
+        raw_transactions = []
+        for (token, to_address, amount_in_units, gas_limit), nonce in zip(transfers, nonces):
+            transaction = {
+                'to': token.address,
+                'value': 0,
+                'data': token.encode_transfer(to_address, amount_in_units),
+                'nonce': nonce,
+                'gas': gas_limit,
+                'gasPrice': gas_price,
+                'chainId': self.chain_id
+            }
+            signed_txn = self.account.sign_transaction(transaction)
+            raw_transactions.append(self.w3.to_hex(signed_txn.rawTransaction))
+        
+        # Sent in nonce order so the node never sees a gap
+        responses = await self.batcher.call_many([
+            ("eth_sendRawTransaction", [raw]) for raw in raw_transactions
+        ])
+        
+        # The hash of a signed transaction is keccak of its raw bytes
+        tx_hashes = [Web3.keccak(hexstr=raw).hex() for raw in raw_transactions]
+        results = [
+            tx_hash if isinstance(result, RpcBatchError) and is_already_known(result) else result
+            for tx_hash, result in zip(tx_hashes, responses)
+        ]
+        failed = [i for i, result in enumerate(results) if isinstance(result, Exception)]
+        
+        if failed:
+            # "nonce too low" also comes back when this very transaction was
+            # already accepted (e.g. by an earlier attempt), and a transport
+            # error doesn't say whether it arrived; never pay twice
+            lookups = await self.batcher.call_many([
+                ("eth_getTransactionByHash", [tx_hashes[i]]) for i in failed
+            ])
+            for i, lookup in zip(failed, lookups):
+                if lookup and not isinstance(lookup, Exception):
+                    results[i] = tx_hashes[i]
+            missing = [i for i, lookup in zip(failed, lookups) if lookup is None]
+            # Re-sign only nonce conflicts the node definitely doesn't have
+            rejected = [i for i in missing if is_nonce_error(results[i])]
+            # Anything else left its nonce unused
+            unused = [i for i in failed if isinstance(results[i], Exception) and i not in rejected]
+            await self._close_gaps(unused, nonces, results, gas_price)
+        else:
+            rejected = []
+        
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed:
+            # Our view of the nonce is stale, or the failed ones left a gap
+            logger.warning(f"{failed} of {len(results)} transfers rejected, resyncing nonce")
+            self.nonces.invalidate()
+        
+        if rejected and retries > 0:
+            try:
+                retried = await self._broadcast_transfers(
+                    [transfers[i] for i in rejected], gas_price, retries - 1
+                )
+            except Exception as e:
+                # Keep what was already sent reported as sent
+                retried = [e] * len(rejected)
+            for i, result in zip(rejected, retried):
+                results[i] = result
+        
+        return results
+    
+    async def _close_gaps(self, unused, nonces, results, gas_price):
+        """
+        Make sure no transfer reported as sent sits behind an unused nonce
+        
+        Gaps are filled with 0-value self-transfers. If one can't be filled,
+        the transfers after it can't be mined yet but would be as soon as
+        anything fills it, so they are reported failed and voided first.
+        """
+        sent = [i for i, result in enumerate(results) if not isinstance(result, Exception)]
+        gaps = [i for i in unused if sent and i < sent[-1]]
+        if not gaps:
+            return
+        
+        filled = await self._send_fillers([(nonces[i], gas_price) for i in gaps])
+        open_gaps = [i for i, ok in zip(gaps, filled) if not ok]
+        if not open_gaps:
+            logger.warning(f"Filled nonce gap(s) {[nonces[i] for i in gaps]} left by failed transfers")
+            return
+        
+        first_open = open_gaps[0]
+        stuck = [i for i in sent if i > first_open]
+        for i in stuck:
+            results[i] = Exception(
+                f"Cancelled: queued behind nonce {nonces[first_open]}, which failed and could not be filled"
+            )
+        # Replacements must outbid the stuck transfers by at least 10%
+        bumped = gas_price * 9 // 8 + 1
+        self._voided.extend(sorted(
+            [(nonces[i], 0) for i in open_gaps] + [(nonces[i], bumped) for i in stuck]
+        ))
+        self.nonces.raise_floor(max(nonces) + 1)
+        logger.error(
+            f"Nonce {nonces[first_open]} could not be filled; voiding {len(stuck)} transfer(s) "
+            f"queued behind it before the next payout"
+        )
+    
+    async def _flush_voided(self, gas_price):
+        """Overwrite voided nonces before sending anything new"""
+        if not self._voided:
+            return
+        voided, self._voided = self._voided, []
+        done = await self._send_fillers([(nonce, max(gas_price, minimum)) for nonce, minimum in voided])
+        self._voided = [entry for entry, ok in zip(voided, done) if not ok]
+        if self._voided:
+            raise Exception(
+                f"Nonces {[nonce for nonce, _ in self._voided]} are still blocked by an earlier failed payout"
+            )
+        logger.info(f"Voided nonces {[nonce for nonce, _ in voided]}")
+    
+    async def _send_fillers(self, entries):
+        """
+        Send 0-value self-transfers at the given (nonce, gas price) pairs
+        
+        Returns:
+            list: Per entry, whether the nonce is now taken (by the filler or
+            by something the node already had)
+        """
+        raw_transactions = []
+        for nonce, gas_price in entries:
+            signed_txn = self.account.sign_transaction({
+                'to': self.tokens.admin_address,
+                'value': 0,
+                'nonce': nonce,
+                'gas': FILLER_GAS_LIMIT,
+                'gasPrice': gas_price,
+                'chainId': self.chain_id
+            })
+            raw_transactions.append(self.w3.to_hex(signed_txn.rawTransaction))
+        
+        responses = await self.batcher.call_many([
+            ("eth_sendRawTransaction", [raw]) for raw in raw_transactions
+        ])
+        taken = []
+        for (nonce, _), response in zip(entries, responses):
+            if not isinstance(response, Exception) or is_already_known(response):
+                taken.append(True)
+            elif "nonce too low" in str(response).lower():
+                logger.warning(f"Nonce {nonce} was already used on chain before it could be filled")
+                taken.append(True)
+            else:
+                logger.error(f"Could not fill nonce {nonce}: {response}")
+                taken.append(False)
+        return taken
+    
+    def _release(self, reservation):
+        for token_symbol, amount in reservation:
+            self.balances.release(token_symbol, amount)
+    
+    async def _balance_of(self, token, owner):
+        """Raw token balance of any wallet"""
+        result = await self.w3.eth.call({'to': token.address, 'data': token.encode_balance_of(owner)})
+        return int.from_bytes(result, 'big')
+    
+    async def get_token_balance(self, token_symbol):
         """Get token balance of admin wallet"""
         try:
-            token_address = TOKEN_CONTRACTS.get(token_symbol)
-            if not token_address:
-                return 0
-            
-            contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=ERC20_ABI
-            )
-            
-            balance = contract.functions.balanceOf(
-                Web3.to_checksum_address(ADMIN_WALLET_ADDRESS)
-            ).call()
-            
-            decimals = contract.functions.decimals().call()
-            
-            return balance / (10 ** decimals)
+            balance = await self.balances.token_balance(token_symbol)
+            return 0 if balance is None else balance
             
         except Exception as e:
             logger.error(f"Error getting balance: {e}")
             return 0
     
-    def get_bnb_balance(self):
+    async def get_bnb_balance(self):
         """Get BNB balance of admin wallet"""
         try:
-            balance = self.w3.eth.get_balance(ADMIN_WALLET_ADDRESS)
-            return self.w3.from_wei(balance, 'ether')
+            return await self.balances.native_balance()
         except Exception as e:
             logger.error(f"Error getting BNB balance: {e}")
             return 0
 
 
+class PayoutQueue:
+    """
+    Collects releases and refunds over a short window and submits them
+    through TransactionHandler.submit_batch in one go
+    """
+    
+    def __init__(self, handler, window=PAYOUT_BATCH_WINDOW, max_batch=PAYOUT_BATCH_MAX):
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+        self._queued = []
+        self._flush_task = None
+    
+    def __len__(self):
+        return len(self._queued)
+    
+    async def submit(self, to_address, amount, token_symbol, on_complete=None):
+        """
+        Queue a payout and wait until its batch is broadcast
+        
+        Returns:
+            dict: Same result as TransactionHandler.submit_token
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queued.append(({
+            'to_address': to_address,
+            'amount': amount,
+            'token_symbol': token_symbol,
+            'on_complete': on_complete
+        }, future))
+        
+        if len(self._queued) >= self.max_batch:
+            asyncio.ensure_future(self._flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+        
+        return await future
+    
+    async def send(self, to_address, amount, token_symbol):
+        """Queue a payout and wait until it is mined (like send_token)"""
+        submitted = await self.submit(to_address, amount, token_symbol)
+        if not submitted['success']:
+            return submitted
+        return await submitted['confirmation']
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        await self._flush()
+    
+    async def _flush(self):
+        batch, self._queued = self._queued, []
+        if not batch:
+            return
+        
+        logger.info(f"Submitting payout batch of {len(batch)}")
+        try:
+            results = await self.handler.submit_batch([payout for payout, _ in batch])
+        except Exception as e:
+            results = [{'success': False, 'error': str(e)}] * len(batch)
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
 # Global transaction handler instance
 tx_handler = TransactionHandler()
+payout_queue = PayoutQueue(tx_handler)
@@ -0,0 +1,64 @@
+"""
+Transfer Log Decoder - Fast path for ERC-20 Transfer logs
+
+The monitor only ever reads Transfer(address,address,uint256) logs, so
+instead of running each one through web3's generic event ABI decoding (and
+the AttributeDict / HexBytes / checksum work around it) the raw JSON-RPC log
+is sliced directly: sender and recipient are the last 20 bytes of topics 1
+and 2, and the value is the 32-byte data word.
+"""
+
+# keccak("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+class TransferLog:
+    """A decoded Transfer log; addresses and hashes are lower-case hex strings"""
+
+    __slots__ = (
+        "token_address", "from_address", "to_address", "value",
+        "tx_hash", "block_number", "block_hash", "log_index", "removed"
+    )
+
+    def __init__(self, token_address, from_address, to_address, value,
+                 tx_hash, block_number, block_hash, log_index, removed=False):
+        self.token_address = token_address
+        self.from_address = from_address
+        self.to_address = to_address
+        self.value = value
+        self.tx_hash = tx_hash
+        self.block_number = block_number
+        self.block_hash = block_hash
+        self.log_index = log_index
+        self.removed = removed
+
+    def __repr__(self):
+        return (
+            f"TransferLog({self.tx_hash}#{self.log_index} {self.from_address} -> "
+            f"{self.to_address} {self.value} @ {self.block_number})"
+        )
+
+
+def decode_transfer_log(raw):
+    """
+    Decode a raw JSON-RPC log (as returned by eth_getLogs or a logs subscription)
+
+    Returns:
+        TransferLog, or None if the log is not an ERC-20 Transfer
+    """
+    topics = raw['topics']
+    # ERC-721 Transfer shares the signature but indexes the token id (4 topics)
+    if len(topics) != 3 or topics[0].lower() != TRANSFER_TOPIC:
+        return None
+
+    return TransferLog(
+        raw['address'].lower(),
+        "0x" + topics[1][-40:].lower(),
+        "0x" + topics[2][-40:].lower(),
+        int(raw['data'][2:] or "0", 16),
+        raw['transactionHash'].lower(),
+        int(raw['blockNumber'], 16),
+        raw['blockHash'].lower(),
+        int(raw['logIndex'], 16),
+        raw.get('removed', False)
+    )
@@ -0,0 +1,73 @@
+"""
+Processed Transaction Set - Bounded dedup for deposit transaction hashes
+
+Hashes are stored as 32-byte binary keys grouped into per-block buckets.
+Once a block is buried more than the retention depth below the scan
+checkpoint it can never be scanned again, so its bucket is evicted. Memory
+stays flat over long uptimes while membership checks remain O(1).
+"""
+import heapq
+
+from config import REORG_SAFETY_DEPTH
+
+
+def tx_hash_key(tx_hash):
+    """Normalize a hex string or bytes-like tx hash to 32 raw bytes"""
+    if isinstance(tx_hash, str):
+        return bytes.fromhex(tx_hash[2:] if tx_hash.startswith("0x") else tx_hash)
+    return bytes(tx_hash)
+
+
+class ProcessedTxSet:
+    def __init__(self, retention_blocks=REORG_SAFETY_DEPTH):
+        self.retention_blocks = retention_blocks
+        # tx hash -> block number
+        self._blocks_by_hash = {}
+        # block number -> hashes processed from that block
+        self._buckets = {}
+        # min-heap of block numbers that own a bucket
+        self._heap = []
+
+    def __len__(self):
+        return len(self._blocks_by_hash)
+
+    def __contains__(self, tx_hash):
+        return tx_hash_key(tx_hash) in self._blocks_by_hash
+
+    def add(self, tx_hash, block_number):
+        key = tx_hash_key(tx_hash)
+        if key in self._blocks_by_hash:
+            return
+
+        bucket = self._buckets.get(block_number)
+        if bucket is None:
+            bucket = self._buckets[block_number] = []
+            heapq.heappush(self._heap, block_number)
+
+        bucket.append(key)
+        self._blocks_by_hash[key] = block_number
+
+    def discard_from_block(self, block_number):
+        """Forget hashes from blocks at or above `block_number`. Returns the removed hashes."""
+        removed = []
+        for bucket_block in [b for b in self._buckets if b >= block_number]:
+            # Heap entries for dropped buckets are skipped when they surface
+            for key in self._buckets.pop(bucket_block):
+                del self._blocks_by_hash[key]
+                removed.append(key)
+        return removed
+
+    def horizon(self, checkpoint):
+        """Lowest block that must still be remembered for a given checkpoint"""
+        return checkpoint - self.retention_blocks
+
+    def prune(self, checkpoint):
+        """Evict every bucket below the horizon. Returns the number of hashes removed."""
+        horizon = self.horizon(checkpoint)
+        removed = 0
+        while self._heap and self._heap[0] < horizon:
+            block_number = heapq.heappop(self._heap)
+            for key in self._buckets.pop(block_number, ()):
+                del self._blocks_by_hash[key]
+                removed += 1
+        return removed
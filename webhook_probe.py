@@ -0,0 +1,59 @@
+"""
+Webhook Probe - POST a synthetic Update to a locally running webhook receiver
+
+Start the bot with BOT_MODE=webhook and WEBHOOK_URL empty (a local receiver,
+nothing is registered with Telegram), then:
+
+    python webhook_probe.py [/command] [--chat-id ID] [--bad-secret]
+
+Prints the receiver's HTTP status: 200 when the update was accepted, 403 when
+the secret token was wrong.
+"""
+import argparse
+import time
+
+import requests
+
+from config import OWNER_ID, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN
+
+
+def synthetic_update(text, chat_id, user_id):
+    """Minimal Update JSON for a text message, as Telegram would push it"""
+    now = int(time.time())
+    chat = {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"}
+    if chat_id < 0:
+        chat["title"] = "Webhook probe"
+    message = {
+        "message_id": now % 1_000_000,
+        "date": now,
+        "chat": chat,
+        "from": {"id": user_id, "is_bot": False, "first_name": "Probe"},
+        "text": text
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": now, "message": message}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="POST a synthetic Update to the local webhook receiver")
+    parser.add_argument("text", nargs="?", default="/status", help="message text (default /status)")
+    parser.add_argument("--chat-id", type=int, default=OWNER_ID, help="chat the message appears in")
+    parser.add_argument("--user-id", type=int, default=OWNER_ID, help="sender of the message")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+    parser.add_argument("--bad-secret", action="store_true", help="send a wrong secret token")
+    args = parser.parse_args()
+
+    secret = "wrong-secret" if args.bad_secret else WEBHOOK_SECRET_TOKEN
+    started = time.perf_counter()
+    response = requests.post(
+        args.url,
+        json=synthetic_update(args.text, args.chat_id, args.user_id),
+        headers={"X-Telegram-Bot-Api-Secret-Token": secret},
+        timeout=10
+    )
+    print(f"{response.status_code} {response.reason} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()